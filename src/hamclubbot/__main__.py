@@ -13,7 +13,7 @@ import logging.config
 import argparse
 import yaml
 import discord
-from hamclubbot.extensions.util import simplebot
+from hamclubbot.extensions.util import logqueue, simplebot
 
 def main():
     """Main entrypoint"""
@@ -42,6 +42,9 @@ def main():
             level=logging.INFO,
             format="%(asctime)s %(levelname)-8s %(name)s : %(message)s")
 
+    # Hand log records to background threads so slow log handlers don't block the bot
+    logqueue.install(config.get('logQueue', None))
+
     # Create the logger
     logger = logging.getLogger("bot")
 
@@ -35,6 +35,19 @@ class About(simplebot.SimpleCog):
         embed.add_field(name="Latency", value=f"{latency} ms")
         await ctx.respond(embed=embed)
 
+    @discord.command(name="memory", description="Shows the size of the bot's caches (owner only)")
+    async def memory(self, ctx: discord.ApplicationContext):
+        """Reports the number of items held in each of the bot's caches"""
+        if not await self.bot.is_owner(ctx.author):
+            await ctx.respond("Sorry, only the owner of the bot can use this command.",
+                ephemeral=True)
+            return
+
+        report = self.bot.cache_report()
+        description = "\n".join(f"* {name}: {size}" for name, size in report.items())
+        embed = self._embed(title="Bot Caches", description=description)
+        await ctx.respond(embed=embed, ephemeral=True)
+
 def setup(bot: simplebot.SimpleBot):
     """Called when the extension is loaded"""
     bot.add_cog(About(bot))
@@ -7,64 +7,210 @@
 """Extension implementing a Cog for returning radio conditions"""
 
 import io
+import asyncio
 import logging
-from typing import cast
+import time
 
-import cairosvg
 import discord
+import discord.ext.tasks
 
-from hamclubbot.extensions.util import webcache, simplebot
+from hamclubbot.extensions.util import imageopt, mufmap, simplebot, solardata, \
+    solarhistory, webcache
 
 logger = logging.getLogger(__name__)
 
+MUF_URL = 'https://prop.kc2g.com/renders/current/mufd-normal-now.svg'
+
 class Conditions(simplebot.SimpleCog):
-    """Provides a set of discord bot commands for checking radio weather conditions"""
+    """
+    Provides a set of discord bot commands for checking radio weather conditions
+
+    Each variant (size and region crop) of a revision of the MUF map is rendered the first
+    time it is requested and reused until the map is refreshed. As soon as a new revision
+    is seen, the whole map is rendered in the background at every size, and each region
+    at the default size. Images are optimized for size once per revision, before they are
+    first uploaded.
+
+    Solar data from hamqsl.com is sampled in the background into a time series store,
+    persisted to disk, from which the 'cond history' charts are drawn.
+    """
     def __init__(self, bot: simplebot.SimpleBot):
-        super().__init__(bot)
+        super().__init__(bot, config_name='conditions')
         self.__cache = webcache.WebCache()
 
-    @discord.command(name="cond", description="Show current conditions from https://hamqsl.com")
+        self.__image_options = {
+            'allow_webp': self.config.get('image_webp', True),
+            'colors': self.config.get('image_colors', 256),
+        }
+        # The longitude/latitude covered by the MUF map is used to locate regions on the map
+        self.__muf = mufmap.MufMap(self.config.get('muf_regions', None),
+            self.config.get('muf_map_bounds', None), self.__image_options)
+        # Regions rendered as soon as a new revision of the MUF map is seen, none if disabled
+        self.__muf_prerender = self.__muf.regions
+        if not self.config.get('muf_prerender', True):
+            self.__muf_prerender = []
+        elif self.config.get('muf_prerender_regions', None) is not None:
+            self.__muf_prerender = self.config['muf_prerender_regions']
+            if not isinstance(self.__muf_prerender, list) or \
+                not set(self.__muf_prerender) <= set(self.__muf.regions):
+                raise SystemExit("invalid configuration: conditions -> muf_prerender_regions: \
+must be a list of the regions in muf_regions")
+
+        self.__solar = solarhistory.SolarHistory(
+            str(self.config.get('solar_history_path', './solar_history.bin')),
+            self.__image_options['allow_webp'])
+        self.ingest_solar.change_interval(
+            minutes=float(self.config.get('solar_poll_minutes', 30)))
+
+    def cache_report(self) -> dict[str, int]:
+        """Returns the number of solar charts kept"""
+        return {'solar_charts': self.__solar.chart_count}
+
+    @discord.Cog.listener()
+    async def on_ready(self):
+        """Starts background tasks once the bot is connected"""
+        if self.__muf_prerender and not self.prerender_muf.is_running():
+            self.prerender_muf.start()
+        if not self.ingest_solar.is_running():
+            self.ingest_solar.start()
+
+    def cog_unload(self):
+        """Stops background tasks when the cog is unloaded"""
+        self.prerender_muf.cancel()
+        self.ingest_solar.cancel()
+
+    @discord.ext.tasks.loop(minutes=30)
+    async def ingest_solar(self):
+        """Periodically samples the hamqsl.com solar data into the time series store"""
+        try:
+            cache_entry = await self.__cache.get_url(solardata.SOLAR_XML_URL)
+            timestamp, values = solardata.parse(cache_entry.content)
+        except (webcache.UpstreamUnavailable, ValueError) as ex:
+            logger.warning("unable to sample solar data: %s", ex)
+            return
+
+        if await self.__solar.add(timestamp, values):
+            logger.debug("sampled solar data %s", values)
+
+    @discord.ext.tasks.loop(minutes=15)
+    async def prerender_muf(self):
+        """Periodically retrieves the MUF map so new revisions are rendered before use"""
+        try:
+            cache_entry = await self.__cache.get_url(MUF_URL)
+        except webcache.UpstreamUnavailable as ex:
+            logger.warning("unable to prerender muf map: %s", ex)
+            return
+
+        await self.__muf.prerender(cache_entry, self.__muf_prerender)
+
+    def get_region_values(self, ctx: discord.AutocompleteContext):
+        """Provides autocomplete support for MUF map regions"""
+        value = (ctx.value or "").lower()
+        return [region for region in self.__muf.regions if region.startswith(value)]
+
+    cond_group = discord.SlashCommandGroup(name="cond",
+        description="Show solar conditions from https://hamqsl.com")
+
+    @cond_group.command(name="now", description="Show current conditions from https://hamqsl.com")
     async def cond(self, ctx: discord.ApplicationContext):
         """Shows current conditions from https://hamqsl.com"""
-        cache_entry = await self.__cache.get_url('https://www.hamqsl.com/solar101pic.php')
-        with io.BytesIO(cache_entry.content) as content:
-            file = discord.File(fp = content, filename='conditions.jpg')
+        url = 'https://www.hamqsl.com/solar101pic.php'
+        cache_entry, image = await self._within_budget(ctx, self.__cond_image(url),
+            defer_now=not self.__cache.is_fresh(url))
+        filename = f"conditions.{image.extension}"
+        with io.BytesIO(image.content) as content:
+            file = discord.File(fp = content, filename=filename)
             embed = self._embed(
                 title = "Current Solar Conditions",
                 description="Images from [hamqsl.com](https://www.hamqsl.com)"
             )
-            embed.set_image(url="attachment://conditions.jpg")
+            embed.set_image(url=f"attachment://{filename}")
             embed.set_footer(text=cache_entry.last_refreshed_str())
 
             await ctx.respond(embed=embed, file=file)
 
+    @cond_group.command(name="history", description="Show a chart of recent solar conditions")
+    @discord.option(name="chart", description="What to chart (default = solar_flux)",
+        choices=list(solarhistory.SOLAR_CHARTS), required=False)
+    @discord.option(name="period", description="How far back to chart (default = week)",
+        choices=list(solarhistory.SOLAR_PERIODS), required=False)
+    async def cond_history(self, ctx: discord.ApplicationContext, chart: str | None = None,
+        period: str | None = None):
+        """Shows a chart of solar conditions from the local time series store"""
+        chart = chart or "solar_flux"
+        period = period or "week"
+        if self.__solar.newest() is None:
+            await ctx.respond("I haven't collected any solar data yet. Please try again later.",
+                ephemeral=True)
+            return
+
+        image = await self._within_budget(ctx, self.__solar.chart(chart, period))
+        last_sample = time.strftime('%Y-%m-%d %H:%M UTC', time.gmtime(self.__solar.newest()))
+        filename = f"history.{image.extension}"
+        with io.BytesIO(image.content) as content:
+            file = discord.File(fp = content, filename = filename)
+            embed = self._embed(
+                title = f"{solarhistory.SOLAR_CHARTS[chart][0]}, past {period}",
+                description="Data from [hamqsl.com](https://www.hamqsl.com)"
+            )
+            embed.set_image(url=f"attachment://{filename}")
+            embed.set_footer(text=f"Last sample {last_sample}")
+
+            await ctx.respond(embed=embed, file=file)
+
     @discord.command(name="muf", description="Show current MUF map from https://prop.kc2g.com")
-    async def muf(self, ctx: discord.ApplicationContext):
+    @discord.option(name="region", description="Part of the world to show (default = world)",
+        autocomplete=get_region_values, required=False)
+    @discord.option(name="size", description="Size of the map (default = large)",
+        choices=list(mufmap.MUF_SIZES), required=False)
+    async def muf(self, ctx: discord.ApplicationContext, region: str | None = None,
+        size: str | None = None):
         """Shows the current MUF map from https://prop.kc2g.com"""
-        url = 'https://prop.kc2g.com/renders/current/mufd-normal-now.svg'
-        cache_entry = await self.__cache.get_url(url)
+        region = (region or "world").lower()
+        size = size or "large"
+        if region not in self.__muf.regions or size not in mufmap.MUF_SIZES:
+            await ctx.respond(f"I don't know the region '{region}'. Try one of: \
+{', '.join(self.__muf.regions)}", ephemeral=True)
+            return
 
-        # If there is no extra data associated with the cache, then we need to
-        # convert the SVG to a PNG and cache the PNG value
-        if not cache_entry.extra:
-            logger.debug("converting muf map from svg to png")
-            png_bytes = cairosvg.svg2png(bytestring = cache_entry.content)
-            cache_entry.extra = png_bytes
-        else:
-            logger.debug("using cached png value of muf map")
-            png_bytes = cache_entry.extra
-
-        with io.BytesIO(cast(bytes, png_bytes)) as content:
-            file = discord.File(fp = content, filename = 'mufmap.png')
+        cache_entry, image = await self._within_budget(ctx,
+            self.__muf_image(region, size),
+            defer_now=not self.__cache.is_fresh(MUF_URL))
+
+        filename = f"mufmap.{image.extension}"
+        with io.BytesIO(image.content) as content:
+            file = discord.File(fp = content, filename = filename)
+            title = "Current MUF Map" if region == "world" else \
+                f"Current MUF Map ({region.replace('_', ' ').title()})"
             embed = self._embed(
-                title = "Current MUF Map",
+                title = title,
                 description="Map from [prop.kc2g.com](https://prop.kc2g.com)"
             )
-            embed.set_image(url="attachment://mufmap.png")
+            embed.set_image(url=f"attachment://{filename}")
             embed.set_footer(text=cache_entry.last_refreshed_str())
 
             await ctx.respond(embed=embed, file=file)
 
+    async def __cond_image(self, url: str) -> tuple[webcache.CacheEntry,
+        imageopt.OptimizedImage]:
+        """Returns the cache entry for the conditions image along with the optimized image"""
+        cache_entry = await self.__cache.get_url(url)
+        if not cache_entry.extra:
+            cache_entry.extra = asyncio.get_running_loop().run_in_executor(None,
+                lambda: imageopt.optimize(cache_entry.content, **self.__image_options))
+        try:
+            return cache_entry, await cache_entry.extra
+        except Exception:
+            # Don't keep failed optimizations around, try again on the next request
+            cache_entry.extra = None
+            raise
+
+    async def __muf_image(self, region: str, size: str) -> tuple[webcache.CacheEntry,
+        imageopt.OptimizedImage]:
+        """Returns the cache entry for the MUF map along with the requested variant"""
+        cache_entry = await self.__cache.get_url(MUF_URL)
+        return cache_entry, await self.__muf.render(cache_entry, region, size)
+
 def setup(bot: simplebot.SimpleBot):
     """Called when the extension is loaded"""
     bot.add_cog(Conditions(bot))
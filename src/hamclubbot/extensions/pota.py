@@ -11,41 +11,152 @@ import json
 import asyncio
 import io
 import logging
+import math
+import time
 import urllib.parse
 
 import discord
+import discord.ext.tasks
 
-from hamclubbot.extensions.util import simplebot, webcache
+from hamclubbot.extensions.util import activationhistory, parkcatalog, roster, simplebot, \
+    spotfeed, views, webcache
 
 logger = logging.getLogger(__name__)
 
+# Number of seconds before the activation history of a park is synced with pota.app again
+HISTORY_REFRESH_SECONDS = 900
+
+# Rankings available from /pota leaderboard as (title, function returning the score)
+LEADERBOARD_RANKINGS = {
+    "activations": ("Activations", lambda stats: stats['activator']['activations']),
+    "activated_parks": ("Activated Parks", lambda stats: stats['activator']['parks']),
+    "activator_qsos": ("Activator QSOs", lambda stats: stats['activator']['qsos']),
+    "hunted_parks": ("Hunted Parks", lambda stats: stats['hunter']['parks']),
+    "hunter_qsos": ("Hunter QSOs", lambda stats: stats['hunter']['qsos']),
+}
+
+# Number of the most recent activations requested when syncing a park with pota.app
+HISTORY_SYNC_COUNT = 5
+
 class Pota(simplebot.SimpleCog):
     """
     Implements commands for querying the Parks on the Air website.
+
+    Park names and locations are served from a local catalog of all parks, which is
+    downloaded in bulk from pota.app and refreshed periodically.
+
+    Park activations are merged into a local history as they are retrieved. Only the few
+    most recent activations are requested from pota.app, except by 'pota history' which
+    requests the full history of a park once (and again if the stored history has a gap).
+
+    Each guild may keep a roster of member callsigns, maintained using the 'manage_pota
+    roster' commands and ranked by the 'pota leaderboard' command using the same cached
+    statistics as 'pota callstats'.
+
+    The cog also polls the pota.app activator spots once for the whole bot and posts
+    new or changed spots to the channels subscribed using the 'manage_pota spots' commands.
     """
 
     def __init__(self, bot: simplebot.SimpleBot):
-        super().__init__(bot)
+        super().__init__(bot, config_name='pota')
         self.__cache = webcache.WebCache()
 
+        dbpath = str(self.config.get('database_path', './pota.db'))
+        self.__catalog = parkcatalog.ParkCatalog(dbpath,
+            refresh_seconds=float(self.config.get('catalog_refresh_hours', 24)) * 3600)
+        self.__catalog.load()
+
+        self.__history = activationhistory.ActivationHistory(dbpath)
+        self.__history_syncs = dict[tuple[str, bool], asyncio.Future]()
+
+        self.__spot_feed = spotfeed.SpotFeed(dbpath)
+        self.poll_spots.change_interval(seconds=float(self.config.get('spot_poll_seconds', 60)))
+
+        self.__roster = roster.ClubRoster(dbpath, max_size=int(self.config.get('roster_max', 50)))
+        # Bounds the pota.app requests made by all leaderboards, including background refreshes
+        self.__leaderboard_slots = asyncio.Semaphore(
+            int(self.config.get('leaderboard_concurrency', 4)))
+
+    def cache_report(self) -> dict[str, int]:
+        """Returns the number of parks in the catalog and the spot feed state"""
+        return {
+            'pota_catalog_parks': self.__catalog.park_count,
+            'pota_spot_subscriptions': self.__spot_feed.subscription_count,
+            'pota_spots': self.__spot_feed.spot_count,
+        }
+
+    @discord.Cog.listener()
+    async def on_ready(self):
+        """Starts background tasks once the bot is connected"""
+        self.__spot_feed.load([guild.id for guild in self.bot.guilds])
+        if not self.refresh_catalog.is_running():
+            self.refresh_catalog.start()
+        if not self.poll_spots.is_running():
+            self.poll_spots.start()
+
+    def cog_unload(self):
+        """Stops background tasks when the cog is unloaded"""
+        self.refresh_catalog.cancel()
+        self.poll_spots.cancel()
+
+    @discord.ext.tasks.loop(hours=1)
+    async def refresh_catalog(self):
+        """Periodically downloads the full park list into the local catalog"""
+        if not self.__catalog.needs_refresh():
+            return
+
+        logger.info("refreshing park catalog from %s", parkcatalog.CATALOG_URL)
+        try:
+            cache_entry = await self.__cache.get_url(parkcatalog.CATALOG_URL)
+        except webcache.UpstreamUnavailable as ex:
+            logger.warning("unable to refresh park catalog: %s", ex)
+            return
+        finally:
+            # The bulk list is large, don't keep it around in the web cache
+            self.__cache.clear_cache(parkcatalog.CATALOG_URL)
+
+        def ingest():
+            parks = parkcatalog.parse_csv(cache_entry.content)
+            if parks:
+                self.__catalog.replace(parks)
+            return len(parks)
+
+        count = await asyncio.get_running_loop().run_in_executor(None, ingest)
+        logger.info("refreshed park catalog with %d parks", count)
+
+    def get_park_values(self, ctx: discord.AutocompleteContext):
+        """Provides autocomplete support for park references and names"""
+        return [discord.OptionChoice(name=f"{reference} - {name}"[:100], value=reference)
+            for reference, name in self.__catalog.complete(ctx.value or "")]
+
     cmd_group = discord.SlashCommandGroup(name="pota",
         description="Query the pota.app website for details")
 
+    manage_group = discord.SlashCommandGroup(name="manage_pota",
+        description="Commands used to manage the POTA features of a server", guild_only=True,
+        default_member_permissions=discord.Permissions(manage_guild=True))
+
     def _format_park_name(self, park_info):
         quoted_park = urllib.parse.quote(park_info['reference'])
         link = f"https://pota.app/#/park/{quoted_park}"
-        return f"[{park_info['reference']}]({link}) - [{park_info['name']}, \
-{park_info['locationName']}]({park_info['website']})"
+        location = park_info.get('locationName', None) or park_info.get('locationDesc', None)
+        name = f"{park_info['name']}, {location}" if location else park_info['name']
+        if park_info.get('website', None):
+            name = f"[{name}]({park_info['website']})"
+        return f"[{park_info['reference']}]({link}) - {name}"
 
     def _format_park_stats(self, park_stats):
         return f"{park_stats['activations']}/{park_stats['attempts']} activations, \
 {park_stats['contacts']} QSOs"
 
+    def _format_date(self, qso_date):
+        date = str(qso_date)
+        return f"{date[0:4]}-{date[4:6]}-{date[6:8]}"
+
     def _format_recent_activations(self, activations):
         with io.StringIO() as result:
             for a in activations:
-                date = str(a['qso_date'])
-                date_str = f"{date[0:4]}-{date[4:6]}-{date[6:8]}"
+                date_str = self._format_date(a['qso_date'])
                 print(f"* {date_str} - **{a['activeCallsign']}** - {a['totalQSOs']} QSOs",
                     file=result)
                 print(f"  * {a['qsosCW']} CW, {a['qsosDATA']} Data, {a['qsosPHONE']} Phone",
@@ -53,35 +164,47 @@ class Pota(simplebot.SimpleCog):
             return result.getvalue()
 
     @cmd_group.command(name="activations", description="Get recent activations for a specific park")
-    @discord.option(name="park", description="The park number (e.g. US-8081)")
+    @discord.option(name="park", description="The park number (e.g. US-8081)",
+        autocomplete=get_park_values)
     async def activations(self, ctx: discord.ApplicationContext, park: str):
         """Responds with recent activations for the given park."""
         park = park.upper()
         quoted_park = urllib.parse.quote(park)
 
-        caches = await asyncio.gather(
-            self.__cache.get_url(f"https://api.pota.app/park/stats/{quoted_park}"),
-            self.__cache.get_url(f"https://api.pota.app/park/{quoted_park}"),
-            self.__cache.get_url(f"https://api.pota.app/park/activations/{quoted_park}?count=5")
-        )
-        stats_cache, info_cache, recent_cache = map(
-            lambda o: cast(webcache.CacheEntry, o), caches)
-        stats_result, info_result, recent_result = map(
-            lambda c: json.loads(c.content), [stats_cache, info_cache, recent_cache])
+        # Park details come from the local catalog. Only ask pota.app if the
+        # park isn't in the catalog (e.g. a brand new park)
+        catalog_info = self.__catalog.get(park)
+        urls = {
+            'stats': f"https://api.pota.app/park/stats/{quoted_park}",
+        }
+        if not catalog_info:
+            urls['info'] = f"https://api.pota.app/park/{quoted_park}"
+
+        # Recent activations come from the local history, synced with pota.app if stale
+        caches = await self._within_budget(ctx,
+            asyncio.gather(self.__sync_history(park),
+                *[self.__cache.get_url(url) for url in urls.values()]),
+            defer_now=self.__history_is_stale(park) or \
+                not all(self.__cache.is_fresh(url) for url in urls.values()))
+        history_error, caches = caches[0], caches[1:]
+        entries = dict(zip(urls.keys(), map(lambda o: cast(webcache.CacheEntry, o), caches)))
+        results = {name: json.loads(entry.content) for name, entry in entries.items()}
+        if catalog_info:
+            results['info'] = catalog_info
+        stats_result, info_result = results['stats'], results['info']
+        recent_result = history_error or self.__history.recent(park, limit=HISTORY_SYNC_COUNT)
+        recent_cache = entries['stats']
 
         # Check for error messages
         if isinstance(stats_result, str):
-            await ctx.respond(
-                f"error while querying the pota website for park {park}: {stats_result}",
-                ephemeral=True)
+            await self.bot.respond_ephemeral(ctx,
+                f"error while querying the pota website for park {park}: {stats_result}")
         elif isinstance(info_result, str):
-            await ctx.respond(
-                f"error while querying the pota website for park {park}: {info_result}",
-                ephemeral=True)
+            await self.bot.respond_ephemeral(ctx,
+                f"error while querying the pota website for park {park}: {info_result}")
         elif isinstance(recent_result, str):
-            await ctx.respond(
-                f"error while querying the pota website for park {park}: {recent_result}",
-                ephemeral=True)
+            await self.bot.respond_ephemeral(ctx,
+                f"error while querying the pota website for park {park}: {recent_result}")
         else:
             embed = self._embed(title=f"{park} Stats",
                 description="Information provided by [pota.app](https://pota.app).")
@@ -94,27 +217,140 @@ class Pota(simplebot.SimpleCog):
                 value=self._format_park_stats(stats_result),
                 inline=False)
             embed.add_field(name="Recent Activations",
-                value=self._format_recent_activations(recent_result),
+                value=self._format_recent_activations(recent_result) or "None",
                 inline=False)
 
             await ctx.respond(embed=embed)
 
+    @cmd_group.command(name="history", description="Browse the activation history of a park")
+    @discord.option(name="park", description="The park number (e.g. US-8081)",
+        autocomplete=get_park_values)
+    async def history(self, ctx: discord.ApplicationContext, park: str):
+        """Responds with a paged view of the activation history for the given park."""
+        park = park.upper()
+        error = await self._within_budget(ctx, self.__sync_history(park, backfill=True),
+            defer_now=self.__history_is_stale(park, backfill=True))
+        if error:
+            await self.bot.respond_ephemeral(ctx,
+                f"error while querying the pota website for park {park}: {error}")
+            return
+
+        count = self.__history.count(park)
+        if count == 0:
+            await self.bot.respond_ephemeral(ctx,
+                f"I don't know of any activations of park {park}.")
+            return
+
+        page_size = 10
+        aggregates = self.__history.aggregates(park)
+        catalog_info = self.__catalog.get(park)
+        page_count = math.ceil(count / page_size)
+
+        def render(page: int) -> discord.Embed:
+            activations = self.__history.recent(park, offset=page * page_size, limit=page_size)
+            embed = self._embed(title=f"{park} Activation History",
+                description=self._format_recent_activations(activations),
+                footer=f"Page {page + 1} of {page_count}. Information provided by pota.app.")
+            if catalog_info:
+                embed.add_field(name="Park Name", value=self._format_park_name(catalog_info),
+                    inline=False)
+            embed.add_field(name="Activations",
+                value=f"{aggregates['activations']} activations by {aggregates['activators']} \
+activators, {self._format_date(aggregates['first'])} to {self._format_date(aggregates['last'])}",
+                inline=False)
+            embed.add_field(name="QSOs by Mode",
+                value=f"{aggregates['qsos']} QSOs: {aggregates['cw']} CW, {aggregates['data']} \
+Data, {aggregates['phone']} Phone",
+                inline=False)
+            return embed
+
+        view = views.PageView(page_count, render, timeout=300)
+        await ctx.respond(embed=view.render(), view=view)
+
+    def __history_is_stale(self, park: str, backfill: bool = False) -> bool:
+        if backfill and not self.__history.is_complete(park):
+            return True
+        return time.time() - self.__history.synced_at(park) >= HISTORY_REFRESH_SECONDS
+
+    async def __sync_history(self, park: str, backfill: bool = False) -> str | None:
+        """
+        Merges the most recent activations of the park into its history.
+
+        Args:
+            park (str): The park reference
+            backfill (bool): Request the full history if the stored history of the park
+                is incomplete (default = False)
+
+        Returns:
+            str: The error message from pota.app, or None if successful
+        """
+        if not self.__history_is_stale(park, backfill):
+            return None
+
+        # Share a single sync between concurrent commands for the same park
+        key = (park, backfill)
+        sync = self.__history_syncs.get(key, None)
+        if sync is None:
+            sync = self.__history_syncs[key] = asyncio.ensure_future(
+                self.__fetch_history(park, backfill))
+            sync.add_done_callback(lambda _: self.__history_syncs.pop(key, None))
+        return await asyncio.shield(sync)
+
+    async def __fetch_history(self, park: str, backfill: bool) -> str | None:
+        # pota.app can't filter by date or page through activations, so only ask for the
+        # most recent few unless the full history was asked for and isn't stored yet
+        latest = self.__history.latest_date(park)
+        count: int | str = "all" if backfill and not self.__history.is_complete(park) \
+            else HISTORY_SYNC_COUNT
+        url = f"https://api.pota.app/park/activations/{urllib.parse.quote(park)}?count={count}"
+        try:
+            cache_entry = await self.__cache.get_url(url)
+        except webcache.UpstreamUnavailable as ex:
+            if latest is None:
+                raise
+            logger.warning("unable to sync activations for %s, using stored history: %s",
+                park, ex)
+            return None
+        finally:
+            # The rows are kept in the history, don't keep them in the web cache too
+            self.__cache.clear_cache(url)
+
+        result = json.loads(cache_entry.content)
+        if isinstance(result, str):
+            return result
+
+        # The stored history is complete if every activation was returned. Otherwise it
+        # stays as it was if the result overlaps the stored activations, and has a gap
+        # (until backfilled) if it doesn't.
+        if count == "all" or len(result) < HISTORY_SYNC_COUNT:
+            complete = True
+        elif latest is not None and min(int(a['qso_date']) for a in result) <= latest:
+            complete = None
+        else:
+            complete = False
+        await asyncio.get_running_loop().run_in_executor(None,
+            self.__history.merge, park, result, complete)
+        return None
+
+    def _callstats_url(self, callsign: str) -> str:
+        return f"https://api.pota.app/stats/user/{urllib.parse.quote(callsign)}"
+
     @cmd_group.command(name="callstats", description="Get POTA statistics for a specific callsign")
     @discord.option(name="callsign", description="The callsign")
     async def callstats(self, ctx: discord.ApplicationContext, callsign: str):
         """Responds with POTA statistics for the given callsign."""
         callsign = callsign.upper()
-        url = f"https://api.pota.app/stats/user/{urllib.parse.quote(callsign)}"
-        cache_entry = await self.__cache.get_url(url)
+        url = self._callstats_url(callsign)
+        cache_entry = await self._within_budget(ctx, self.__cache.get_url(url),
+            defer_now=not self.__cache.is_fresh(url))
         logger.debug("queried %s and received %s", url, cache_entry.content)
 
         result = json.loads(cache_entry.content)
 
         if isinstance(result, str):
             # Error message from the pota API
-            await ctx.respond(
-                f"error while querying the pota website for callsign {callsign}: {result}",
-                ephemeral=True)
+            await self.bot.respond_ephemeral(ctx,
+                f"error while querying the pota website for callsign {callsign}: {result}")
         else:
             link = f"https://pota.app/#/profile/{urllib.parse.quote(callsign)}"
             embed = self._embed(title=f"{callsign}'s POTA Stats",
@@ -135,6 +371,202 @@ class Pota(simplebot.SimpleCog):
 
             await ctx.respond(embed=embed)
 
+    @discord.ext.tasks.loop(seconds=60)
+    async def poll_spots(self):
+        """Polls the activator spots and posts new or changed spots to subscribed channels"""
+        # Always ask for the current spots, the feed is only polled here
+        self.__cache.clear_cache(spotfeed.SPOTS_URL)
+        try:
+            cache_entry = await self.__cache.get_url(spotfeed.SPOTS_URL)
+            spots = json.loads(cache_entry.content)
+        except (webcache.UpstreamUnavailable, ValueError) as ex:
+            logger.warning("unable to poll pota spots: %s", ex)
+            return
+        if not isinstance(spots, list):
+            logger.warning("unexpected response polling pota spots: %s", spots)
+            return
+
+        for channel_id, channel_spots in self.__spot_feed.update(spots).items():
+            await self.__post_spots(channel_id, channel_spots)
+
+    async def __post_spots(self, channel_id: int, spots: list[dict]) -> None:
+        """Posts spots to a subscribed channel, unsubscribing it if the bot can't post there"""
+        try:
+            channel = self.bot.get_channel(channel_id) or \
+                await self.bot.fetch_channel(channel_id)
+            await channel.send(embed=self.__spots_embed(spots))
+        except (discord.NotFound, discord.Forbidden) as ex:
+            # The channel was deleted, or the bot is no longer allowed to post in it
+            logger.warning("unsubscribing channel %d from pota spots: %s", channel_id, ex)
+            self.__spot_feed.drop(channel_id)
+        except discord.HTTPException as ex:
+            logger.warning("unable to post spots to channel %d: %s", channel_id, ex)
+
+    def __spots_embed(self, spots: list[dict], limit: int = 15) -> discord.Embed:
+        with io.StringIO() as result:
+            for spot in spots[:limit]:
+                reference = spot.get('reference', None) or "?"
+                link = f"https://pota.app/#/park/{urllib.parse.quote(reference)}"
+                band = spotfeed.band_for(spot.get('frequency', None))
+                line = f"* **{spot.get('activator', None)}** at [{reference}]({link}) \
+{spot.get('parkName', None) or spot.get('name', None) or ''} - {spot.get('frequency', None)} kHz \
+{spot.get('mode', None) or ''}{f' ({band})' if band else ''}"
+                if spot.get('comments', None):
+                    line += f" - {spot['comments']}"
+                print(line, file=result)
+            if len(spots) > limit:
+                print(f"...and {len(spots) - limit} more", file=result)
+            description = result.getvalue()
+
+        return self._embed(title="POTA Spots", description=description,
+            footer="Spots provided by pota.app")
+
+    spots_group = manage_group.create_subgroup(name="spots",
+        description="Post POTA activator spots to a channel")
+
+    @spots_group.command(name="subscribe",
+        description="Post new POTA spots to this channel, optionally filtered")
+    @discord.option(name="program", description="Only spots for this program (e.g. US, VE)",
+        required=False)
+    @discord.option(name="band", description="Only spots on this band", required=False,
+        choices=[name for _, _, name in spotfeed.BANDS])
+    @discord.option(name="mode", description="Only spots using this mode (e.g. CW, SSB, FT8)",
+        required=False)
+    async def spots_subscribe(self, ctx: discord.ApplicationContext,
+        program: str | None = None, band: str | None = None, mode: str | None = None):
+        """Subscribes the current channel to the spot feed"""
+        permissions = ctx.interaction.app_permissions
+        if not (permissions.send_messages and permissions.embed_links):
+            await ctx.respond("I need permission to send messages and embed links in this \
+channel to post POTA spots.", ephemeral=True)
+            return
+
+        record = self.__spot_feed.subscribe(ctx.guild_id, ctx.channel_id, ctx.user.id,
+            {'program': program, 'band': band, 'mode': mode})
+
+        filters = [f"{name} {record[name]}" for name in ('program', 'band', 'mode')
+            if record[name]]
+        await ctx.respond(
+            f"OK, I'll post new POTA spots to this channel \
+({', '.join(filters) if filters else 'all spots'}).")
+
+    @spots_group.command(name="unsubscribe",
+        description="Stop posting POTA spots to this channel")
+    async def spots_unsubscribe(self, ctx: discord.ApplicationContext):
+        """Unsubscribes the current channel from the spot feed"""
+        if self.__spot_feed.unsubscribe(ctx.guild_id, ctx.channel_id):
+            await ctx.respond("OK, I'll stop posting POTA spots to this channel.")
+        else:
+            await ctx.respond("This channel isn't subscribed to POTA spots.", ephemeral=True)
+
+    def get_roster_values(self, ctx: discord.AutocompleteContext):
+        """Provides autocomplete support for callsigns in the guild's roster"""
+        return self.__roster.complete(ctx.interaction.guild_id or 0, ctx.value or "")
+
+    roster_group = manage_group.create_subgroup(name="roster",
+        description="Manage the club callsigns ranked by /pota leaderboard")
+
+    @roster_group.command(name="add", description="Add a callsign to the club roster")
+    @discord.option(name="callsign", description="The callsign")
+    async def roster_add(self, ctx: discord.ApplicationContext, callsign: str):
+        """Adds a callsign to the guild's roster"""
+        callsign = callsign.strip().upper()
+        if self.__roster.contains(ctx.guild_id, callsign):
+            await ctx.respond(f"{callsign} is already on the roster.", ephemeral=True)
+            return
+        try:
+            self.__roster.add(ctx.guild_id, callsign, ctx.user.id)
+        except ValueError:
+            await ctx.respond(f"The roster is limited to {self.__roster.max_size} callsigns. \
+Please remove a callsign first.", ephemeral=True)
+            return
+
+        await ctx.respond(f"OK, I added {callsign} to the roster.", ephemeral=True)
+
+    @roster_group.command(name="remove", description="Remove a callsign from the club roster")
+    @discord.option(name="callsign", description="The callsign", autocomplete=get_roster_values)
+    async def roster_remove(self, ctx: discord.ApplicationContext, callsign: str):
+        """Removes a callsign from the guild's roster"""
+        callsign = callsign.strip().upper()
+        if not self.__roster.remove(ctx.guild_id, callsign):
+            await ctx.respond(f"{callsign} isn't on the roster.", ephemeral=True)
+            return
+
+        await ctx.respond(f"OK, I removed {callsign} from the roster.", ephemeral=True)
+
+    @roster_group.command(name="list", description="List the callsigns on the club roster")
+    async def roster_list(self, ctx: discord.ApplicationContext):
+        """Lists the callsigns on the guild's roster"""
+        callsigns = self.__roster.callsigns(ctx.guild_id)
+        if not callsigns:
+            await ctx.respond(
+                "The roster is empty. Add callsigns using **/manage_pota roster add**",
+                ephemeral=True)
+            return
+
+        embed = self._embed(title="Club Roster", description=", ".join(callsigns),
+            footer=f"{len(callsigns)}/{self.__roster.max_size} callsigns")
+        await ctx.respond(embed=embed, ephemeral=True)
+
+    @cmd_group.command(name="leaderboard", description="Rank the club roster by POTA statistics")
+    @discord.option(name="ranking", description="What to rank by (default = activations)",
+        choices=list(LEADERBOARD_RANKINGS), required=False)
+    async def leaderboard(self, ctx: discord.ApplicationContext, ranking: str | None = None):
+        """Responds with the guild's roster ranked by the given POTA statistic."""
+        if ctx.guild_id is None:
+            await ctx.respond("The leaderboard is only available in servers.", ephemeral=True)
+            return
+
+        callsigns = self.__roster.callsigns(ctx.guild_id)
+        if not callsigns:
+            await ctx.respond(
+                "The roster is empty. Add callsigns using **/manage_pota roster add**",
+                ephemeral=True)
+            return
+
+        # Cached stats (even if expired) are used as-is and refreshed in the background,
+        # only callsigns never seen before wait on pota.app
+        results = await self._within_budget(ctx,
+            asyncio.gather(*[self.__leaderboard_stats(callsign) for callsign in callsigns]),
+            defer_now=not all(self.__cache.is_cached(self._callstats_url(callsign))
+                for callsign in callsigns))
+
+        await ctx.respond(embed=self._format_leaderboard(ranking or "activations",
+            callsigns, results))
+
+    def _format_leaderboard(self, ranking: str, callsigns: list[str],
+        results: list[dict | None]) -> discord.Embed:
+        title, score = LEADERBOARD_RANKINGS[ranking]
+        ranked = sorted(((score(stats), callsign) for callsign, stats in zip(callsigns, results)
+            if stats), key=lambda item: (-item[0], item[1]))
+        missing = len(callsigns) - len(ranked)
+
+        with io.StringIO() as result:
+            for place, (value, callsign) in enumerate(ranked[:25], start=1):
+                link = f"https://pota.app/#/profile/{urllib.parse.quote(callsign)}"
+                print(f"{place}. [{callsign}]({link}) - {value}", file=result)
+            description = result.getvalue() or "No statistics available."
+
+        footer = "Information provided by pota.app."
+        if missing:
+            footer = f"{missing} callsign(s) unavailable. {footer}"
+        return self._embed(title=f"Club Leaderboard - {title}", description=description,
+            footer=footer)
+
+    async def __leaderboard_stats(self, callsign: str) -> dict | None:
+        """Returns the POTA stats for a callsign, or None if unavailable"""
+        url = self._callstats_url(callsign)
+        try:
+            cache_entry = await self.__cache.get_url(url, allow_stale=True,
+                limit=self.__leaderboard_slots)
+            stats = json.loads(cache_entry.content)
+        except (webcache.UpstreamUnavailable, ValueError) as ex:
+            logger.warning("unable to get pota stats for %s: %s", callsign, ex)
+            return None
+
+        # The pota API returns an error message (string) for unknown callsigns
+        return stats if isinstance(stats, dict) else None
+
 def setup(bot: simplebot.SimpleBot):
     """Called when the extension is loaded"""
     bot.add_cog(Pota(bot))
@@ -0,0 +1,134 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements a local store of POTA park activation history"""
+
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+class ActivationHistory:
+    """
+    Stores the activations of POTA parks in a local sqlite3 table.
+
+    Activations retrieved from pota.app are merged into the table, so only activations
+    newer than those already stored need to be retrieved again. Paging and aggregate
+    queries are answered from the local table.
+
+    Each park is also marked complete once its full history has been stored, and
+    incomplete again if newer activations are merged without overlapping those stored
+    (i.e. there may be a gap).
+    """
+
+    def __init__(self, dbpath: str):
+        self.__dbpath = dbpath
+
+        with sqlite3.connect(self.__dbpath) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS activations (\
+                          reference TEXT, qso_date INTEGER, callsign TEXT,\
+                          total INTEGER, cw INTEGER, data INTEGER, phone INTEGER,\
+                          PRIMARY KEY (reference, qso_date, callsign))")
+            conn.execute("CREATE TABLE IF NOT EXISTS activation_sync (\
+                          reference TEXT PRIMARY KEY, synced_at REAL, complete INTEGER)")
+
+    def synced_at(self, reference: str) -> float:
+        """Returns the time the park was last synced with pota.app. 0 if never synced"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            row = conn.execute("SELECT synced_at FROM activation_sync WHERE reference=?",
+                (reference,)).fetchone()
+            return row[0] if row else 0.0
+
+    def is_complete(self, reference: str) -> bool:
+        """Returns True if the full activation history of the park is stored"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            row = conn.execute("SELECT complete FROM activation_sync WHERE reference=?",
+                (reference,)).fetchone()
+            return bool(row and row[0])
+
+    def latest_date(self, reference: str) -> int | None:
+        """Returns the date (YYYYMMDD) of the most recent stored activation of the park"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            row = conn.execute("SELECT MAX(qso_date) FROM activations WHERE reference=?",
+                (reference,)).fetchone()
+            return row[0] if row else None
+
+    def merge(self, reference: str, activations: list[dict],
+        complete: bool | None = None) -> int:
+        """
+        Merges activations as returned by pota.app into the store and marks the park as
+        synced. Activations already stored are updated with the latest QSO counts.
+
+        Args:
+            reference (str): The park reference
+            activations (list): The activations retrieved from pota.app
+            complete (bool): Whether the store now holds the full history of the park,
+                None to leave it unchanged (default = None)
+
+        Returns:
+            int: The number of activations that were added or changed
+        """
+        with sqlite3.connect(self.__dbpath) as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT INTO activations\
+                              (reference, qso_date, callsign, total, cw, data, phone)\
+                              VALUES (?, ?, ?, ?, ?, ?, ?)\
+                              ON CONFLICT(reference, qso_date, callsign) DO UPDATE SET\
+                              total=excluded.total, cw=excluded.cw, data=excluded.data,\
+                              phone=excluded.phone\
+                              WHERE (total, cw, data, phone) IS NOT\
+                              (excluded.total, excluded.cw, excluded.data, excluded.phone)",
+                [(reference, int(a['qso_date']), a['activeCallsign'], a['totalQSOs'],
+                  a['qsosCW'], a['qsosDATA'], a['qsosPHONE']) for a in activations])
+            changed = conn.total_changes - before
+            conn.execute("INSERT INTO activation_sync (reference, synced_at, complete)\
+                          VALUES (?, ?, COALESCE(?, 0))\
+                          ON CONFLICT(reference) DO UPDATE SET synced_at=excluded.synced_at,\
+                          complete=COALESCE(?, complete)",
+                (reference, time.time(), complete, complete))
+        logger.debug("merged %d new or changed activations for %s", changed, reference)
+        return changed
+
+    def count(self, reference: str) -> int:
+        """Returns the number of stored activations for the park"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            return conn.execute("SELECT COUNT(*) FROM activations WHERE reference=?",
+                (reference,)).fetchone()[0]
+
+    def recent(self, reference: str, offset: int = 0, limit: int = 5) -> list[dict]:
+        """Returns stored activations for the park, most recent first, in the same
+        format as returned by pota.app"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            cursor = conn.execute("SELECT qso_date, callsign, total, cw, data, phone\
+                                   FROM activations WHERE reference=?\
+                                   ORDER BY qso_date DESC, callsign ASC LIMIT ? OFFSET ?",
+                                   (reference, limit, offset))
+            return [{
+                'qso_date': row[0],
+                'activeCallsign': row[1],
+                'totalQSOs': row[2],
+                'qsosCW': row[3],
+                'qsosDATA': row[4],
+                'qsosPHONE': row[5],
+            } for row in cursor]
+
+    def aggregates(self, reference: str) -> dict:
+        """Returns totals for the park computed from the stored activations"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            row = conn.execute("SELECT COUNT(*), COUNT(DISTINCT callsign), SUM(total),\
+                                SUM(cw), SUM(data), SUM(phone), MIN(qso_date), MAX(qso_date)\
+                                FROM activations WHERE reference=?", (reference,)).fetchone()
+        return {
+            'activations': row[0],
+            'activators': row[1],
+            'qsos': row[2] or 0,
+            'cw': row[3] or 0,
+            'data': row[4] or 0,
+            'phone': row[5] or 0,
+            'first': row[6],
+            'last': row[7],
+        }
@@ -0,0 +1,121 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements simple charts rendered as SVG documents"""
+
+import time
+from xml.sax.saxutils import escape
+
+COLORS = ["#2ecc71", "#3498db", "#e74c3c", "#f1c40f", "#9b59b6", "#1abc9c", "#e67e22", "#95a5a6"]
+
+class _Plot:
+    """Maps (timestamp, value) samples to coordinates within the plot area of a chart"""
+
+    LEFT, RIGHT, TOP, BOTTOM = 60, 20, 60, 40
+
+    def __init__(self, width: int, height: int, samples: list[tuple[float, float]],
+        y_range: tuple[float, float] | None = None):
+        self.width, self.height = width, height
+        self.t_min = min((t for t, _ in samples), default=0)
+        self.t_span = (max((t for t, _ in samples), default=1) - self.t_min) or 1
+        if y_range:
+            v_min, v_max = y_range
+        else:
+            v_min = min((v for _, v in samples), default=0)
+            v_max = max((v for _, v in samples), default=1)
+            padding = (v_max - v_min) * 0.1 or 1
+            v_min, v_max = v_min - padding, v_max + padding
+        self.v_min, self.v_span = v_min, (v_max - v_min) or 1
+
+    @property
+    def plot_width(self) -> int:
+        """Returns the width of the plot area"""
+        return self.width - _Plot.LEFT - _Plot.RIGHT
+
+    @property
+    def plot_height(self) -> int:
+        """Returns the height of the plot area"""
+        return self.height - _Plot.TOP - _Plot.BOTTOM
+
+    def x(self, t: float) -> float:
+        """Returns the x coordinate of a timestamp"""
+        return _Plot.LEFT + (t - self.t_min) / self.t_span * self.plot_width
+
+    def y(self, v: float) -> float:
+        """Returns the y coordinate of a value"""
+        return _Plot.TOP + self.plot_height - (v - self.v_min) / self.v_span * self.plot_height
+
+def _y_axis(plot: _Plot, y_labels: dict[float, str] | None) -> list[str]:
+    """Returns the grid lines and labels of the y axis"""
+    ticks = y_labels or {plot.v_min + plot.v_span * i / 4:
+        f"{plot.v_min + plot.v_span * i / 4:.1f}" for i in range(5)}
+    parts = []
+    for value, label in ticks.items():
+        y = plot.y(value)
+        parts.append(f'<line x1="{_Plot.LEFT}" y1="{y:.1f}" x2="{plot.width - _Plot.RIGHT}" '
+            f'y2="{y:.1f}" stroke="#4e5058" stroke-width="1"/>')
+        parts.append(f'<text x="{_Plot.LEFT - 6}" y="{y + 4:.1f}" fill="#b5bac1" '
+            f'text-anchor="end">{escape(label)}</text>')
+    return parts
+
+def _x_axis(plot: _Plot) -> list[str]:
+    """Returns the labels of the x axis"""
+    time_format = "%H:%M" if plot.t_span <= 2 * 86400 else "%b %d"
+    parts = []
+    for i in range(5):
+        t = plot.t_min + plot.t_span * i / 4
+        parts.append(f'<text x="{plot.x(t):.1f}" y="{plot.height - _Plot.BOTTOM + 18}" '
+            f'fill="#b5bac1" text-anchor="middle">'
+            f'{time.strftime(time_format, time.gmtime(t))}</text>')
+    return parts
+
+def _line(plot: _Plot, i: int, name: str, points: list[tuple[float, float]]) -> list[str]:
+    """Returns the line, and legend entry, of the i'th series"""
+    color = COLORS[i % len(COLORS)]
+    parts = []
+    if len(points) == 1:
+        t, v = points[0]
+        parts.append(f'<circle cx="{plot.x(t):.1f}" cy="{plot.y(v):.1f}" r="3" fill="{color}"/>')
+    elif points:
+        path = " ".join(f"{plot.x(t):.1f},{plot.y(v):.1f}" for t, v in points)
+        parts.append(f'<polyline points="{path}" fill="none" stroke="{color}" '
+            f'stroke-width="2"/>')
+
+    legend_x = _Plot.LEFT + (i % 4) * (plot.plot_width / 4)
+    legend_y = 40 + (i // 4) * 14
+    parts.append(f'<rect x="{legend_x:.1f}" y="{legend_y - 9}" width="10" height="10" '
+        f'fill="{color}"/>')
+    parts.append(f'<text x="{legend_x + 14:.1f}" y="{legend_y}" fill="#ffffff">'
+        f'{escape(name)}</text>')
+    return parts
+
+def line_chart(title: str, series: dict[str, list[tuple[float, float]]],
+    y_labels: dict[float, str] | None = None, width: int = 800, height: int = 400) -> bytes:
+    """
+    Returns an SVG line chart of time series data.
+
+    Args:
+        title (str): The title of the chart
+        series (dict): The (timestamp, value) samples of each line, keyed by name
+        y_labels (dict): Optionally label the y axis at these values instead of using
+            evenly spaced numbers (e.g. {0: "Poor", 1: "Fair", 2: "Good"})
+        width (int): The width of the chart in pixels (default = 800)
+        height (int): The height of the chart in pixels (default = 400)
+    """
+    plot = _Plot(width, height, [sample for points in series.values() for sample in points],
+        (min(y_labels), max(y_labels)) if y_labels else None)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="12">',
+        f'<rect width="{width}" height="{height}" fill="#2b2d31"/>',
+        f'<text x="{width / 2}" y="22" fill="#ffffff" font-size="16" '
+        f'text-anchor="middle">{escape(title)}</text>']
+    parts.extend(_y_axis(plot, y_labels))
+    parts.extend(_x_axis(plot))
+    for i, (name, points) in enumerate(series.items()):
+        parts.extend(_line(plot, i, name, points))
+    parts.append('</svg>')
+    return "".join(parts).encode("utf-8")
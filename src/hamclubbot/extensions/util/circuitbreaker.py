@@ -0,0 +1,94 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements a basic circuit breaker for calls to upstream services"""
+
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Implements a circuit breaker protecting calls to an upstream service.
+
+    The breaker starts 'closed' and allows all calls. After 'failure_threshold'
+    consecutive failures it 'opens' and rejects calls for 'reset_seconds'. Once
+    that time passes, it becomes 'half-open' and allows a single trial call. A
+    successful trial closes the breaker, a failed trial opens it again. A trial
+    which is released, or never reports its outcome within 'reset_seconds', no
+    longer blocks the next one.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 60):
+        self.__name = name
+        self.__failure_threshold = failure_threshold
+        self.__reset_seconds = reset_seconds
+        self.__failures = 0
+        # The breaker is closed while __opened_at is None
+        self.__opened_at: float | None = None
+        self.__trial_started_at: float | None = None
+        self.__rejected = 0
+
+    def __str__(self) -> str:
+        return f"breaker name={self.__name} state={self.state} failures={self.__failures} \
+rejected={self.__rejected}"
+
+    @property
+    def name(self) -> str:
+        """Returns the name of the upstream protected by this breaker"""
+        return self.__name
+
+    @property
+    def state(self) -> str:
+        """Returns the current state of the breaker (closed, open or half-open)"""
+        if self.__opened_at is None:
+            return CircuitBreaker.CLOSED
+        if time.monotonic() - self.__opened_at < self.__reset_seconds:
+            return CircuitBreaker.OPEN
+        return CircuitBreaker.HALF_OPEN
+
+    def allow(self) -> bool:
+        """Returns True if a call may be made to the upstream service"""
+        state = self.state
+        if state == CircuitBreaker.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if state == CircuitBreaker.HALF_OPEN and (self.__trial_started_at is None or \
+            now - self.__trial_started_at >= self.__reset_seconds):
+            self.__trial_started_at = now
+            return True
+
+        self.__rejected += 1
+        return False
+
+    def release(self) -> None:
+        """Ends an allowed call without an outcome (e.g. it was cancelled), so a half-open
+        breaker allows another trial"""
+        self.__trial_started_at = None
+
+    def record_success(self) -> None:
+        """Records a successful call, closing the breaker"""
+        if self.__opened_at is not None:
+            logger.info("closing circuit breaker for %s", self.__name)
+        self.__opened_at = None
+        self.__failures = 0
+        self.__trial_started_at = None
+
+    def record_failure(self) -> None:
+        """Records a failed call, opening the breaker if the threshold is reached"""
+        self.__failures += 1
+        self.__trial_started_at = None
+        if self.__opened_at is not None or self.__failures >= self.__failure_threshold:
+            if self.state != CircuitBreaker.OPEN:
+                logger.warning("opening circuit breaker for %s after %d failures",
+                    self.__name, self.__failures)
+            self.__opened_at = time.monotonic()
@@ -0,0 +1,83 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements size optimization of images before they are uploaded to discord"""
+
+import io
+import logging
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+class OptimizedImage:
+    """Represents an image after optimization, along with its size before and after"""
+
+    def __init__(self, content: bytes, extension: str, original_size: int):
+        self.__content = content
+        self.__extension = extension
+        self.__original_size = original_size
+
+    def __str__(self) -> str:
+        return f"optimized image format={self.__extension} original_size={self.__original_size} \
+size={self.size}"
+
+    @property
+    def content(self) -> bytes:
+        """Returns the optimized image content"""
+        return self.__content
+
+    @property
+    def extension(self) -> str:
+        """Returns the file extension matching the format of the optimized image"""
+        return self.__extension
+
+    @property
+    def original_size(self) -> int:
+        """Returns the size, in bytes, of the image before optimization"""
+        return self.__original_size
+
+    @property
+    def size(self) -> int:
+        """Returns the size, in bytes, of the optimized image"""
+        return len(self.__content)
+
+def _encode(image: Image.Image, image_format: str, **params) -> bytes:
+    with io.BytesIO() as result:
+        image.save(result, format=image_format, **params)
+        return result.getvalue()
+
+def optimize(content: bytes, allow_webp: bool = True, colors: int | None = 256) -> OptimizedImage:
+    """
+    Returns the smallest encoding of the image. This is CPU intensive, call it from an executor.
+
+    The image is quantized to a palette, then the smallest of the original image, a
+    maximally compressed PNG and, if allowed, a lossless WebP is returned.
+
+    Args:
+        content (bytes): The image to optimize
+        allow_webp (bool): Consider WebP encodings (default = True)
+        colors (int): Maximum number of colors when quantizing to a palette. None
+            skips quantization, so the image is only recompressed (default = 256)
+    """
+    with Image.open(io.BytesIO(content)) as image:
+        extension = {"JPEG": "jpg"}.get(image.format, (image.format or "png").lower())
+        candidates = [(content, extension)]
+
+        # Don't flatten animations
+        if not getattr(image, "is_animated", False):
+            source = image.convert("RGBA")
+            if colors:
+                source = source.quantize(colors=colors, method=Image.Quantize.FASTOCTREE)
+            candidates.append((_encode(source, "PNG", optimize=True), "png"))
+            if allow_webp:
+                candidates.append((_encode(source, "WEBP", lossless=True, method=6), "webp"))
+
+    best, best_extension = min(candidates, key=lambda candidate: len(candidate[0]))
+    result = OptimizedImage(best, best_extension, len(content))
+    logger.info("%s (%.0f%% smaller)", result,
+        100 * (1 - result.size / max(1, result.original_size)))
+    return result
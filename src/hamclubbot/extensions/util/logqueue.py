@@ -0,0 +1,105 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements non-blocking logging through a queue serviced by a background thread"""
+
+import atexit
+import dataclasses
+import logging
+import logging.handlers
+import queue
+import random
+import time
+
+# Rate limits applied to hot paths unless 'rateLimits' is configured
+DEFAULT_RATE_LIMITS = {
+    # Cache hits are logged on every command
+    "hamclubbot.extensions.util.webcache": {'per_second': 1},
+}
+
+@dataclasses.dataclass(eq=False)
+class RateLimitFilter(logging.Filter):
+    """
+    Limits how often a log message is emitted.
+
+    Records are grouped by logger and message format, so a hot path logging the same
+    message with different arguments shares a single allowance. Records of level
+    WARNING and above are never dropped.
+
+    Args:
+        per_second (float): Emit at most this many records per second for each message
+        sample_rate (float): Emit only this fraction (0 to 1) of records
+    """
+    per_second: float | None = None
+    sample_rate: float | None = None
+    _windows: dict[tuple[str, object], tuple[float, int]] = dataclasses.field(
+        default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        super().__init__()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if self.sample_rate is not None and random.random() >= self.sample_rate:
+            return False
+        if self.per_second is None:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        window_start, count = self._windows.get(key, (now, 0))
+        if now - window_start >= 1:
+            window_start, count = now, 0
+        if count >= self.per_second:
+            self._windows[key] = (window_start, count)
+            return False
+        self._windows[key] = (window_start, count + 1)
+        return True
+
+def _enqueue_handlers(logger: logging.Logger) -> logging.handlers.QueueListener:
+    """Moves the handlers of the logger behind a queue serviced by a background thread"""
+    handlers = list(logger.handlers)
+    for handler in handlers:
+        logger.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    # Flush anything still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
+
+def install(config: dict | None = None) -> list[logging.handlers.QueueListener]:
+    """
+    Moves the handlers of all configured loggers behind queues serviced by background
+    threads, so logging calls never wait on slow handlers (files, streams, etc).
+
+    Args:
+        config (dict): The 'logQueue' section of the config file. Logging through the
+            queue is enabled unless 'enabled' is false. 'rateLimits' optionally maps logger
+            names to a RateLimitFilter configuration ('per_second' and/or 'sample_rate'),
+            replacing DEFAULT_RATE_LIMITS.
+
+    Returns:
+        list: The listeners servicing the queues. Empty if not enabled
+    """
+    config = config if config is not None else {}
+
+    rate_limits = config.get('rateLimits', None)
+    for name, limits in (DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits).items():
+        logging.getLogger(name).addFilter(RateLimitFilter(
+            per_second=limits.get('per_second', None),
+            sample_rate=limits.get('sample_rate', None)))
+
+    if not config.get('enabled', True):
+        return []
+
+    loggers = [logging.getLogger()] + [logger for logger in
+        logging.Logger.manager.loggerDict.values() if isinstance(logger, logging.Logger)]
+    return [_enqueue_handlers(logger) for logger in loggers if logger.handlers]
@@ -0,0 +1,122 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements rendering of the MUF map cropped to regions and scaled to sizes"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from hamclubbot.extensions.util import imageopt, svgrender, webcache
+
+logger = logging.getLogger(__name__)
+
+# Widths, in pixels, of the MUF map renders. None renders at the width of the whole map,
+# even when cropped to a region.
+MUF_SIZES = {
+    "large": None,
+    "medium": 1200,
+    "small": 640,
+}
+
+# Regions of the MUF map as (west longitude, south latitude, east longitude, north latitude).
+# None is the whole map.
+DEFAULT_MUF_REGIONS = {
+    "world": None,
+    "north_america": [-170, 10, -50, 75],
+    "south_america": [-95, -60, -30, 15],
+    "europe": [-25, 34, 45, 72],
+    "africa": [-20, -37, 55, 38],
+    "asia": [55, 0, 150, 60],
+    "oceania": [110, -50, 180, 0],
+}
+
+# MUF renders are CPU intensive, limit how many run at once
+_render_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mufrender")
+
+def _render_variant(svg: bytes, box: tuple[float, float, float, float] | None,
+    width: int | None, image_options: dict) -> imageopt.OptimizedImage:
+    """Renders and optimizes a single variant of the MUF map"""
+    return imageopt.optimize(svgrender.render_png(svg, box, width), **image_options)
+
+class MufMap:
+    """
+    Renders variants (region crops and sizes) of the MUF map.
+
+    Each variant of a revision of the map is rendered off the event loop the first time
+    it is requested, and kept in the 'extra' field of the map's cache entry until the map
+    is refreshed.
+    """
+
+    def __init__(self, regions: dict[str, list[float] | None] | None = None,
+        bounds: list[float] | None = None, image_options: dict | None = None):
+        """
+        Constructor
+
+        Args:
+            regions (dict): The [west, south, east, north] bounds of each region, None
+                for the whole map (default = DEFAULT_MUF_REGIONS)
+            bounds (list): The [west, south, east, north] longitude/latitude covered by the
+                map (default = the whole world)
+            image_options (dict): Arguments passed to imageopt.optimize()
+        """
+        self.__regions = regions if regions else DEFAULT_MUF_REGIONS
+        self.__bounds = bounds if bounds else [-180, -90, 180, 90]
+        self.__image_options = image_options if image_options else {}
+
+    @property
+    def regions(self) -> list[str]:
+        """Returns the names of the regions available"""
+        return list(self.__regions)
+
+    async def render(self, cache_entry: webcache.CacheEntry, region: str,
+        size: str) -> imageopt.OptimizedImage:
+        """Returns the requested variant of the map revision held by the cache entry"""
+        variants = cache_entry.extra if isinstance(cache_entry.extra, dict) else {}
+        cache_entry.extra = variants
+
+        key = (region, size)
+        variant = variants.get(key, None)
+        if variant is None:
+            logger.debug("rendering muf map variant %s", key)
+            variant = variants[key] = asyncio.get_running_loop().run_in_executor(
+                _render_executor, _render_variant, cache_entry.content,
+                self.__region_box(self.__regions[region]), MUF_SIZES[size],
+                self.__image_options)
+        try:
+            return await variant
+        except Exception:
+            # Don't keep failed renders around, try again on the next request
+            if variants.get(key, None) is variant:
+                del variants[key]
+            raise
+
+    async def prerender(self, cache_entry: webcache.CacheEntry, regions: list[str],
+        size: str = "large") -> None:
+        """
+        Renders variants of the map revision held by the cache entry, logging any failures.
+
+        Args:
+            cache_entry (webcache.CacheEntry): The cache entry holding the map
+            regions (list): The regions to render. Those showing the whole map are
+                rendered at every size, the others only at the given size
+            size (str): The size of the region crops (default = large)
+        """
+        variants = dict.fromkeys((region, variant_size) for region in regions
+            for variant_size in (MUF_SIZES if self.__regions[region] is None else [size]))
+        results = await asyncio.gather(*[self.render(cache_entry, region, variant_size)
+            for region, variant_size in variants], return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("failed to render muf map variant: %s", result)
+
+    def __region_box(self, region: list[float] | None) -> tuple[float, float, float, float] | None:
+        """Converts a region's longitude/latitude bounds to fractions of the MUF map"""
+        if not region:
+            return None
+        west, south, east, north = self.__bounds
+        return ((region[0] - west) / (east - west), (north - region[3]) / (north - south),
+            (region[2] - west) / (east - west), (north - region[1]) / (north - south))
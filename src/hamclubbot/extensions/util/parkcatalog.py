@@ -0,0 +1,146 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements a local catalog of POTA parks"""
+
+import bisect
+import csv
+import io
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bulk list of all parks published by pota.app
+CATALOG_URL = "https://pota.app/all_parks_ext.csv"
+
+def parse_csv(content: bytes) -> list[dict]:
+    """Parses the bulk park list downloaded from CATALOG_URL"""
+    parks = []
+    with io.StringIO(content.decode("utf-8-sig")) as stream:
+        for row in csv.DictReader(stream):
+            reference = (row.get('reference', None) or "").strip().upper()
+            if not reference:
+                continue
+            parks.append({
+                'reference': reference,
+                'name': row.get('name', None) or "",
+                'active': int(row.get('active', None) or 1),
+                'locationDesc': row.get('locationDesc', None) or "",
+                'latitude': _float_or_none(row.get('latitude', None)),
+                'longitude': _float_or_none(row.get('longitude', None)),
+                'grid': row.get('grid', None) or "",
+            })
+    return parks
+
+def _float_or_none(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+class ParkCatalog:
+    """
+    Provides park information from a local sqlite3 table, refreshed in bulk from pota.app.
+
+    References and names are also held in a sorted in-memory index used to answer
+    prefix queries (e.g. for autocomplete) without touching the database.
+    """
+
+    def __init__(self, dbpath: str, refresh_seconds: float = 86400):
+        self.__dbpath = dbpath
+        self.__refresh_seconds = refresh_seconds
+        # (sorted keys, (reference, name) of each key, park count). load() runs on an
+        # executor thread, so the index is only ever replaced, and read, as a whole
+        self.__index: tuple[list[str], list[tuple[str, str]], int] = ([], [], 0)
+
+        with sqlite3.connect(self.__dbpath) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS parks (\
+                          reference TEXT PRIMARY KEY, name TEXT, active INTEGER,\
+                          location TEXT, latitude REAL, longitude REAL, grid TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS parks_name ON parks (name COLLATE NOCASE)")
+            conn.execute("CREATE TABLE IF NOT EXISTS park_catalog_meta (\
+                          key TEXT PRIMARY KEY, value TEXT)")
+
+    def load(self) -> None:
+        """Rebuilds the in-memory prefix index from the database"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            rows = conn.execute("SELECT reference, name FROM parks").fetchall()
+
+        entries = []
+        for reference, name in rows:
+            entries.append((reference.lower(), reference, name))
+            if name:
+                entries.append((name.lower(), reference, name))
+        entries.sort()
+
+        # Swap in the new index with a single store so lookups never see a partial index
+        self.__index = ([e[0] for e in entries], [(e[1], e[2]) for e in entries], len(rows))
+        logger.info("loaded park catalog index with %d parks", len(rows))
+
+    def replace(self, parks: list[dict]) -> None:
+        """Replaces the catalog content with the given parks and rebuilds the index"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            conn.execute("DELETE FROM parks")
+            conn.executemany("INSERT OR REPLACE INTO parks\
+                              (reference, name, active, location, latitude, longitude, grid)\
+                              VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(p['reference'], p['name'], p['active'], p['locationDesc'],
+                  p['latitude'], p['longitude'], p['grid']) for p in parks])
+            conn.execute("INSERT INTO park_catalog_meta (key, value) VALUES ('refreshed_at', ?)\
+                          ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                (str(time.time()),))
+        self.load()
+
+    def last_refreshed(self) -> float:
+        """Returns the timestamp of the last bulk refresh. 0 if never refreshed"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            row = conn.execute(
+                "SELECT value FROM park_catalog_meta WHERE key='refreshed_at'").fetchone()
+            return float(row[0]) if row else 0.0
+
+    def needs_refresh(self) -> bool:
+        """Returns True if the last bulk refresh is older than the refresh interval"""
+        return time.time() - self.last_refreshed() >= self.__refresh_seconds
+
+    def get(self, reference: str) -> dict | None:
+        """Returns the park with the given reference, or None if not in the catalog"""
+        with sqlite3.connect(self.__dbpath) as conn:
+            row = conn.execute("SELECT reference, name, active, location, latitude, longitude,\
+                                grid FROM parks WHERE reference=?", (reference.upper(),)).fetchone()
+        if row is None:
+            return None
+        return {
+            'reference': row[0],
+            'name': row[1],
+            'active': row[2],
+            'locationDesc': row[3],
+            'latitude': row[4],
+            'longitude': row[5],
+            'grid': row[6],
+        }
+
+    def complete(self, prefix: str, limit: int = 25) -> list[tuple[str, str]]:
+        """Returns up to 'limit' (reference, name) pairs whose reference or name starts
+        with the given prefix (case insensitive)"""
+        keys, refs, _ = self.__index
+        prefix = prefix.lower()
+        result = list[tuple[str, str]]()
+        seen = set[str]()
+
+        i = bisect.bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(result) < limit:
+            if refs[i][0] not in seen:
+                seen.add(refs[i][0])
+                result.append(refs[i])
+            i += 1
+        return result
+
+    @property
+    def park_count(self) -> int:
+        """Returns the number of parks held in the in-memory index"""
+        return self.__index[2]
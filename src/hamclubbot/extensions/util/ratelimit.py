@@ -0,0 +1,200 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements token bucket rate limiting used for command admission control"""
+
+import time
+
+class TokenBucket:
+    """
+    Implements a simple token bucket.
+
+    The bucket holds at most 'capacity' tokens and is refilled continuously at
+    'rate' tokens per second. Each admitted call consumes a single token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__tokens = capacity
+        self.__updated_at = time.monotonic()
+
+    def __refill(self, now: float):
+        elapsed = now - self.__updated_at
+        self.__tokens = min(self.__capacity, self.__tokens + elapsed * self.__rate)
+        self.__updated_at = now
+
+    def peek(self) -> bool:
+        """Returns True if a token is currently available, without consuming it"""
+        self.__refill(time.monotonic())
+        return self.__tokens >= 1
+
+    def consume(self) -> None:
+        """Consumes a single token from the bucket"""
+        self.__refill(time.monotonic())
+        self.__tokens -= 1
+
+    def retry_after(self) -> float:
+        """Returns the number of seconds until a token will be available"""
+        self.__refill(time.monotonic())
+        if self.__tokens >= 1 or self.__rate <= 0:
+            return 0.0
+        return (1 - self.__tokens) / self.__rate
+
+    def is_full(self) -> bool:
+        """Returns True if the bucket is at capacity (i.e. has been idle)"""
+        self.__refill(time.monotonic())
+        return self.__tokens >= self.__capacity
+
+class RateLimiter:
+    """
+    Maintains a set of token buckets sharing the same limits, keyed by an
+    arbitrary hashable value (e.g. a guild or user id).
+    """
+
+    def __init__(self, calls: float, per_seconds: float, burst: float | None = None):
+        """
+        Constructor
+
+        Args:
+            calls (float): The number of calls allowed per 'per_seconds'
+            per_seconds (float): The period over which 'calls' are allowed
+            burst (float): The maximum number of calls allowed back to back
+                (default = calls)
+
+        Raises:
+            ValueError: If the limits would never admit a call
+        """
+        if calls <= 0 or per_seconds <= 0:
+            raise ValueError("'calls' and 'per_seconds' must be greater than zero")
+        if burst is not None and burst < 1:
+            raise ValueError("'burst' must be at least 1")
+        self.__rate = calls / per_seconds
+        self.__capacity = burst if burst else calls
+        self.__buckets = dict[object, TokenBucket]()
+
+    @classmethod
+    def from_config(cls, config: dict | None) -> 'RateLimiter':
+        """
+        Creates a rate limiter from a config dictionary.
+
+        Raises:
+            ValueError: If the configuration is missing or invalid
+        """
+        if not isinstance(config, dict) or 'calls' not in config:
+            raise ValueError("'calls' is required")
+        try:
+            calls = float(config['calls'])
+            per_seconds = float(config.get('per_seconds', 60))
+            burst = float(config['burst']) if config.get('burst', None) is not None else None
+        except (TypeError, ValueError) as ex:
+            raise ValueError("'calls', 'per_seconds' and 'burst' must be numbers") from ex
+        return cls(calls, per_seconds, burst)
+
+    def bucket(self, key: object) -> TokenBucket:
+        """Returns the bucket for the given key, creating it if needed"""
+        bucket = self.__buckets.get(key, None)
+        if bucket is None:
+            bucket = self.__buckets[key] = TokenBucket(self.__rate, self.__capacity)
+        return bucket
+
+    def prune(self) -> int:
+        """Removes idle (full) buckets to bound memory use. Returns the number removed"""
+        idle = [key for key, bucket in self.__buckets.items() if bucket.is_full()]
+        for key in idle:
+            del self.__buckets[key]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self.__buckets)
+
+def admit(buckets: list[TokenBucket]) -> float:
+    """
+    Attempts to admit a call against all of the given buckets.
+
+    A token is consumed from every bucket only if all of them have a token available,
+    so a call rejected by one limit does not use up the allowance of the others.
+
+    Returns:
+        float: 0 if the call was admitted, otherwise the number of seconds until it
+            would be admitted
+    """
+    if all(bucket.peek() for bucket in buckets):
+        for bucket in buckets:
+            bucket.consume()
+        return 0.0
+    return max(bucket.retry_after() for bucket in buckets)
+
+class AdmissionControl:
+    """
+    Applies the optional guild, user and per command rate limits to commands.
+
+    Guild limits are shared by all users of a guild, user limits apply to each user
+    across guilds and command limits apply to each user of a guild for that command.
+    """
+
+    def __init__(self, guild: RateLimiter | None = None, user: RateLimiter | None = None,
+        commands: dict[str, RateLimiter] | None = None):
+        self.__guild = guild
+        self.__user = user
+        self.__commands = dict(commands) if commands else {}
+
+    @classmethod
+    def from_config(cls, config: dict | None) -> 'AdmissionControl':
+        """
+        Creates admission control from the 'rateLimits' section of the config file.
+
+        Raises:
+            ValueError: If any configured limit is invalid, naming the offending entry
+        """
+        config = config if config else {}
+
+        def limiter(path: str, limit: dict | None) -> RateLimiter:
+            try:
+                return RateLimiter.from_config(limit)
+            except ValueError as ex:
+                raise ValueError(f"rateLimits -> {path}: {ex}") from ex
+
+        guild = limiter('guild', config['guild']) if 'guild' in config else None
+        user = limiter('user', config['user']) if 'user' in config else None
+        commands = {command: limiter(f"commands -> {command}", limit)
+            for command, limit in (config.get('commands', None) or {}).items()}
+        return cls(guild, user, commands)
+
+    def __limiters(self) -> list[RateLimiter]:
+        limiters = [self.__guild, self.__user] + list(self.__commands.values())
+        return [limiter for limiter in limiters if limiter is not None]
+
+    def check(self, guild_id: int | None, user_id: int, command: str) -> tuple[str, float] | None:
+        """
+        Attempts to admit a call to a command.
+
+        Returns:
+            tuple: None if the call was admitted, otherwise the scope ("guild", "user" or
+                "command") blocking the call for the longest and the number of seconds until
+                it would be admitted
+        """
+        scoped = list[tuple[str, TokenBucket]]()
+        if self.__guild is not None and guild_id:
+            scoped.append(("guild", self.__guild.bucket(guild_id)))
+        if self.__user is not None:
+            scoped.append(("user", self.__user.bucket(user_id)))
+        if command in self.__commands:
+            scoped.append(("command", self.__commands[command].bucket((guild_id, user_id))))
+
+        if not scoped or admit([bucket for _, bucket in scoped]) == 0:
+            return None
+
+        # Report the scope that is blocking the call for the longest
+        scope, bucket = max(scoped, key=lambda item: item[1].retry_after())
+        return scope, bucket.retry_after()
+
+    def prune(self) -> int:
+        """Removes idle buckets from all limiters. Returns the number removed"""
+        return sum(limiter.prune() for limiter in self.__limiters())
+
+    def __len__(self) -> int:
+        return sum(len(limiter) for limiter in self.__limiters())
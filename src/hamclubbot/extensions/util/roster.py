@@ -0,0 +1,71 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements a per-guild roster of club member callsigns"""
+
+import json
+import time
+
+from hamclubbot.extensions.util import persistentstore
+
+class ClubRoster:
+    """
+    Maintains the callsigns of club members for each guild, kept in the persistent
+    guild store under 'roster:<CALLSIGN>' keys.
+    """
+
+    def __init__(self, dbpath: str, max_size: int = 50):
+        self.__dbpath = dbpath
+        self.__max_size = max_size
+
+    @property
+    def max_size(self) -> int:
+        """Returns the maximum number of callsigns in each guild's roster"""
+        return self.__max_size
+
+    def __store(self, guild_id: int) -> persistentstore.PersistentGuildStore:
+        return persistentstore.PersistentGuildStore(guild_id, self.__dbpath)
+
+    def callsigns(self, guild_id: int) -> list[str]:
+        """Returns the callsigns on the guild's roster, in alphabetical order"""
+        return [key.split(":", 1)[1] for key in self.__store(guild_id).get_keys("roster:")]
+
+    def complete(self, guild_id: int, prefix: str, limit: int = 25) -> list[str]:
+        """Returns up to 'limit' callsigns on the guild's roster starting with the prefix"""
+        keys = self.__store(guild_id).get_keys(f"roster:{prefix.upper()}")
+        return [key.split(":", 1)[1] for key in keys][:limit]
+
+    def contains(self, guild_id: int, callsign: str) -> bool:
+        """Returns True if the callsign is on the guild's roster"""
+        return bool(self.__store(guild_id).get_value(f"roster:{callsign.upper()}"))
+
+    def add(self, guild_id: int, callsign: str, user_id: int) -> None:
+        """
+        Adds the callsign to the guild's roster.
+
+        Raises:
+            ValueError: The roster already holds max_size callsigns
+        """
+        ps = self.__store(guild_id)
+        if len(ps.get_keys("roster:")) >= self.__max_size:
+            raise ValueError(f"the roster is limited to {self.__max_size} callsigns")
+
+        callsign = callsign.upper()
+        record = {
+            'callsign': callsign,
+            'last_updated': {
+                'user_id': user_id,
+                'timestamp': time.time()
+            }
+        }
+        ps.set_value(f"roster:{callsign}", json.dumps(record))
+
+    def remove(self, guild_id: int, callsign: str) -> bool:
+        """Removes the callsign from the guild's roster. Returns False if it wasn't on it"""
+        if not self.contains(guild_id, callsign):
+            return False
+        self.__store(guild_id).delete_value(f"roster:{callsign.upper()}")
+        return True
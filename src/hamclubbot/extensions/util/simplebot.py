@@ -7,13 +7,27 @@
 """Implements derived classes for discord.Bot and discord.Cog to provide common functionality"""
 
 import time
+import asyncio
 import logging
+from collections.abc import Awaitable
+from typing import TypeVar
 
 import discord
 import discord.ext.tasks
 
+from hamclubbot.extensions.util import ratelimit, webcache
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+class CommandThrottled(discord.CheckFailure):
+    """Raised when a command is rejected by the bot's admission control"""
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"command throttled by {scope} limit, retry after {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
 class SimpleBot(discord.Bot):
     """Common base class for discord bots providing some standard functionality"""
     class CommandStats:
@@ -22,11 +36,14 @@ class SimpleBot(discord.Bot):
             self.__received = 0
             self.__completed = 0
             self.__errors = 0
+            self.__throttled = 0
+            self.__deferred = 0
             self.__command = command
 
         def __str__(self) -> str:
             return f"cmdstats command={self.__command} received={self.__received} \
-completed={self.__completed} errors={self.__errors}"
+completed={self.__completed} errors={self.__errors} throttled={self.__throttled} \
+deferred={self.__deferred}"
 
         def incr_completed(self):
             """Increments the number of completed calls to this command"""
@@ -40,16 +57,79 @@ completed={self.__completed} errors={self.__errors}"
             """Increments the number of calls to this command resulting in an error"""
             self.__errors += 1
 
+        def incr_throttled(self):
+            """Increments the number of calls to this command rejected by admission control"""
+            self.__throttled += 1
+
+        def incr_deferred(self):
+            """Increments the number of calls to this command that had to be deferred"""
+            self.__deferred += 1
+
     def __init__(self, config: dict | None = None, **kwargs):
+        config = config if config else {}
+        for name, value in SimpleBot.__gateway_options(config.get('gateway', None) or {}).items():
+            kwargs.setdefault(name, value)
         super().__init__(**kwargs)
 
         # Record the time the bot started
         self.__start_time = time.time()
-        self.__config = config if config else {}
-        self.owner_id = self.config.get('ownerId', None)
+        self.__config = config
+        owner_id = self.config.get('ownerId', None)
+        self.owner_id = int(owner_id) if owner_id else None
 
         self.__command_stats = dict[str, SimpleBot.CommandStats]()
 
+        # Admission control. Each limit is optional and configured in the 'rateLimits'
+        # section of the config file.
+        try:
+            self.__admission = ratelimit.AdmissionControl.from_config(
+                self.config.get('rateLimits', None))
+        except ValueError as ex:
+            raise SystemExit(f"invalid configuration: {ex}") from ex
+        self.add_check(self.__admission_check, call_once=True)
+
+        # Discord fails interactions not acknowledged within 3 seconds. Commands waiting
+        # on slow work are deferred once this budget is exceeded.
+        interactions = self.config.get('interactions', None) or {}
+        self.__defer_after_seconds = float(interactions.get('defer_after_seconds', 2.0))
+        self.__deferred = set[int]()
+
+    @staticmethod
+    def __gateway_options(gateway: dict) -> dict:
+        """
+        Returns the client options for the 'gateway' config section.
+
+        All commands are slash commands, so by default only the guilds intent is requested
+        and members and messages are not cached.
+        """
+        return {
+            'intents': SimpleBot.__flags(discord.Intents, 'intents',
+                gateway.get('intents', ['guilds'])),
+            'member_cache_flags': SimpleBot.__flags(discord.MemberCacheFlags, 'member_cache',
+                gateway.get('member_cache', [])),
+            # A message cache size of None disables it, zero would use the default size
+            'max_messages': gateway.get('max_messages', None) or None,
+            'chunk_guilds_at_startup': gateway.get('chunk_guilds_at_startup', False),
+        }
+
+    @staticmethod
+    def __flags(flags_type: type[T], option: str, names: object) -> T:
+        """
+        Returns the flags (e.g. discord.Intents) with only the named flags set.
+
+        Raises:
+            SystemExit: The names aren't a list of valid flags
+        """
+        if not isinstance(names, list):
+            raise SystemExit(f"invalid configuration: gateway -> {option}: must be a list")
+        flags = flags_type.none()
+        for name in names:
+            if not isinstance(name, str) or name not in flags_type.VALID_FLAGS:
+                raise SystemExit(f"invalid configuration: gateway -> {option}: unknown flag \
+'{name}'")
+            setattr(flags, name, True)
+        return flags
+
     async def on_ready(self):
         """Called once the bot is ready (connected to discord, caches primed, etc)"""
         self.log_command_stats.start()
@@ -64,19 +144,61 @@ completed={self.__completed} errors={self.__errors}"
     async def on_application_command_completion(self, ctx: discord.ApplicationContext):
         """Called when an application slash command completes successfully"""
         self.__get_command_stats(str(ctx.command)).incr_completed()
+        self.__deferred.discard(ctx.interaction.id)
 
     async def on_application_command_error(self, context: discord.ApplicationContext,
         exception: discord.DiscordException):
         """Called when an unhandled error occurs while processing a slash command"""
+        if isinstance(exception, CommandThrottled):
+            self.__get_command_stats(str(context.command)).incr_throttled()
+            logger.debug("throttled command '%s' guild_id=%s user_id=%s: %s", context.command,
+                context.guild_id, context.author.id, exception)
+            await self.respond_ephemeral(context, f"Slow down! Too many requests, please try \
+again in {max(1, round(exception.retry_after))} seconds.")
+            return
+
         self.__get_command_stats(str(context.command)).incr_errors()
+        original = getattr(exception, 'original', None)
+        if isinstance(original, webcache.UpstreamUnavailable):
+            logger.warning("upstream unavailable while processing command '%s': %s",
+                context.command, original)
+            await self.respond_ephemeral(context,
+                f"Sorry, {original.host} isn't responding right now. Please try again later.")
+            return
+
         logger.error("error while processing command '%s': %s", context.command, exception,
             exc_info=True)
 
+        # Discord reports the failure of a command that was never acknowledged, but a
+        # deferred one would be left "thinking" until the interaction expires
+        if context.interaction.id in self.__deferred:
+            try:
+                await self.respond_ephemeral(context,
+                    "Sorry, something went wrong while processing this command.")
+            except discord.HTTPException as ex:
+                logger.warning("unable to report error for command '%s': %s",
+                    context.command, ex)
+            self.__deferred.discard(context.interaction.id)
+
     @discord.ext.tasks.loop(minutes=5)
     async def log_command_stats(self):
         """Called periodically to log statistics on commands called"""
         for stats in self.__command_stats.values():
             logger.info(stats)
+        for breaker in webcache.breakers():
+            logger.info(breaker)
+        logger.info("cachestats %s",
+            " ".join(f"{name}={size}" for name, size in self.cache_report().items()))
+
+        # Drop idle buckets so the limiters don't grow with every user ever seen
+        self.__admission.prune()
+
+    async def __admission_check(self, ctx: discord.ApplicationContext) -> bool:
+        """Global check rejecting commands exceeding the configured rate limits"""
+        rejected = self.__admission.check(ctx.guild_id, ctx.author.id, str(ctx.command))
+        if rejected:
+            raise CommandThrottled(*rejected)
+        return True
 
     def __get_command_stats(self, command: str):
         if command in self.__command_stats:
@@ -85,6 +207,53 @@ completed={self.__completed} errors={self.__errors}"
             stats = self.__command_stats[command] = SimpleBot.CommandStats(command)
         return stats
 
+    def cache_report(self) -> dict[str, int]:
+        """Returns the number of items held in each of the bot's caches"""
+        report = {
+            'guilds': len(self.guilds),
+            'channels': sum(len(guild.channels) for guild in self.guilds),
+            'roles': sum(len(guild.roles) for guild in self.guilds),
+            'members': sum(len(guild.members) for guild in self.guilds),
+            'users': len(self.users),
+            'emojis': len(self.emojis),
+            'stickers': len(self.stickers),
+            'messages': len(self.cached_messages),
+            'private_channels': len(self.private_channels),
+        }
+        entries, size = webcache.cache_usage()
+        report['webcache_entries'] = entries
+        report['webcache_bytes'] = size
+        report['rate_limit_buckets'] = len(self.__admission)
+
+        for cog in self.cogs.values():
+            if isinstance(cog, SimpleCog):
+                report.update(cog.cache_report())
+        return report
+
+    async def defer_command(self, ctx: discord.ApplicationContext) -> None:
+        """Defers the response to a command, recording the deferral in the command stats"""
+        if ctx.interaction.response.is_done():
+            return
+        self.__get_command_stats(str(ctx.command)).incr_deferred()
+        self.__deferred.add(ctx.interaction.id)
+        await ctx.defer()
+
+    async def respond_ephemeral(self, ctx: discord.ApplicationContext, content: str) -> None:
+        """
+        Responds to a command with a message only visible to the caller (e.g. an error).
+
+        The first followup to a deferred interaction replaces the public "thinking" message
+        and keeps its visibility, so if the command was deferred by defer_command() that
+        message is deleted and the response is sent as a separate ephemeral followup.
+        """
+        if ctx.interaction.id not in self.__deferred:
+            await ctx.respond(content, ephemeral=True)
+            return
+
+        self.__deferred.discard(ctx.interaction.id)
+        await ctx.interaction.delete_original_response()
+        await ctx.followup.send(content, ephemeral=True)
+
     async def on_unknown_application_command(self, interaction: discord.Interaction):
         """Called when an unknown application command is received"""
         logger.error("received unknown application command: %s", interaction)
@@ -94,6 +263,11 @@ completed={self.__completed} errors={self.__errors}"
         """Returns the configuration (from file) for the bot"""
         return self.__config
 
+    @property
+    def defer_after_seconds(self) -> float:
+        """Returns the time a command may spend before its response is deferred"""
+        return self.__defer_after_seconds
+
     @property
     def uptime(self) -> float:
         """Returns uptime for the bot in seconds"""
@@ -123,6 +297,34 @@ class SimpleCog(discord.Cog):
         """Returns the dictionary containing the cogs configuration from the config file"""
         return self.__config
 
+    async def _within_budget(self, ctx: discord.ApplicationContext, aw: Awaitable[T],
+        defer_now: bool = False) -> T:
+        """
+        Awaits the given work, deferring the interaction if it is not ready in time.
+
+        Args:
+            ctx (discord.ApplicationContext): The context of the command being processed
+            aw (Awaitable): The work producing the data needed for the response
+            defer_now (bool): Defer immediately, e.g. because the work is known to
+                require an upstream fetch (default = False)
+
+        Returns:
+            The result of the work. Once deferred, ctx.respond() sends a public followup
+            message, use bot.respond_ephemeral() for replies only the caller should see.
+        """
+        task = asyncio.ensure_future(aw)
+        if not defer_now:
+            done, _ = await asyncio.wait({task}, timeout=self.bot.defer_after_seconds)
+            if done:
+                return task.result()
+
+        await self.bot.defer_command(ctx)
+        return await task
+
+    def cache_report(self) -> dict[str, int]:
+        """Returns the number of items held in each of the cog's own caches"""
+        return {}
+
     def _embed(self, title: str | None = None, description: str | None = None,
         footer: str | None = None) -> discord.Embed:
         """Creates and returns an embed with consistent formatting"""
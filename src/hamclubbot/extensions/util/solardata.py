@@ -0,0 +1,66 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements parsing of the solar data feed published by hamqsl.com"""
+
+import calendar
+import logging
+import time
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# Structured solar data published by hamqsl.com
+SOLAR_XML_URL = "https://www.hamqsl.com/solarxml.php"
+
+# Band groups reported in the calculated conditions
+BANDS = ["80m-40m", "30m-20m", "17m-15m", "12m-10m"]
+
+# Band conditions are stored as numbers
+CONDITIONS = {"poor": 0.0, "fair": 1.0, "good": 2.0}
+
+# Names of the fields of each sample
+FIELDS = ["solar_flux", "a_index", "k_index", "sunspots"] + \
+    [f"{band}_{period}" for period in ("day", "night") for band in BANDS]
+
+def _number(text: str | None) -> float | None:
+    try:
+        return float(text.strip()) if text else None
+    except ValueError:
+        return None
+
+def parse(content: bytes) -> tuple[float, dict[str, float | None]]:
+    """
+    Parses the solar data feed.
+
+    Returns:
+        tuple: The time the data was updated by hamqsl.com and the sample values keyed
+            by the names in FIELDS
+    """
+    root = ET.fromstring(content)
+    data = root.find("solardata")
+    if data is None:
+        raise ValueError("missing solardata element")
+
+    updated = (data.findtext("updated") or "").strip()
+    try:
+        timestamp = float(calendar.timegm(time.strptime(updated, "%d %b %Y %H%M %Z")))
+    except ValueError:
+        logger.debug("unable to parse solar data update time '%s'", updated)
+        timestamp = time.time()
+
+    values: dict[str, float | None] = {
+        'solar_flux': _number(data.findtext("solarflux")),
+        'a_index': _number(data.findtext("aindex")),
+        'k_index': _number(data.findtext("kindex")),
+        'sunspots': _number(data.findtext("sunspots")),
+    }
+    for band in data.iterfind("calculatedconditions/band"):
+        field = f"{band.get('name')}_{band.get('time')}"
+        if field in FIELDS:
+            values[field] = CONDITIONS.get((band.text or "").strip().lower(), None)
+
+    return timestamp, values
@@ -0,0 +1,93 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements the local history of solar data and the charts drawn from it"""
+
+import asyncio
+import time
+
+from hamclubbot.extensions.util import charts, imageopt, solardata, svgrender, timeseries
+
+# Charts available from /cond history as (title, {field: line name}, y axis labels)
+SOLAR_CHARTS = {
+    "solar_flux": ("Solar Flux Index", {"solar_flux": "SFI"}, None),
+    "indices": ("A and K Index", {"a_index": "A Index", "k_index": "K Index"}, None),
+    "sunspots": ("Sunspot Number", {"sunspots": "Sunspots"}, None),
+    "bands_day": ("Band Conditions (Day)",
+        {f"{band}_day": band for band in solardata.BANDS},
+        {value: name.title() for name, value in solardata.CONDITIONS.items()}),
+    "bands_night": ("Band Conditions (Night)",
+        {f"{band}_night": band for band in solardata.BANDS},
+        {value: name.title() for name, value in solardata.CONDITIONS.items()}),
+}
+
+# Periods available from /cond history, in seconds
+SOLAR_PERIODS = {
+    "day": 86400,
+    "week": 7 * 86400,
+    "month": 30 * 86400,
+    "year": 365 * 86400,
+}
+
+def _render_chart(title: str, series: dict[str, list[tuple[float, float]]],
+    y_labels: dict[float, str] | None, allow_webp: bool) -> imageopt.OptimizedImage:
+    """Renders and optimizes a chart of solar data"""
+    return imageopt.optimize(svgrender.render_png(charts.line_chart(title, series, y_labels)),
+        allow_webp, None)
+
+class SolarHistory:
+    """
+    Keeps the solar data sampled from hamqsl.com in a time series store persisted to disk.
+
+    Raw samples cover a month of hourly updates and daily averages cover two years.
+    Charts are rendered off the event loop and reused until a new sample is added.
+    """
+
+    def __init__(self, path: str, allow_webp: bool = True):
+        self.__path = path
+        self.__allow_webp = allow_webp
+        self.__store = timeseries.TimeSeriesStore(solardata.FIELDS, raw_capacity=31 * 24,
+            rollup_seconds=86400, rollup_capacity=2 * 366)
+        self.__store.load(self.__path)
+        self.__charts = dict[tuple[str, str], tuple[float | None, asyncio.Future]]()
+
+    def newest(self) -> float | None:
+        """Returns the timestamp of the newest sample, or None if empty"""
+        return self.__store.newest()
+
+    async def add(self, timestamp: float, values: dict[str, float | None]) -> bool:
+        """Adds a sample and saves the store. Returns False if the sample isn't new"""
+        # hamqsl.com updates less often than it is polled, only keep new samples
+        newest = self.__store.newest()
+        if newest is not None and timestamp <= newest:
+            return False
+
+        self.__store.add(timestamp, values)
+        await asyncio.get_running_loop().run_in_executor(None, self.__store.save, self.__path)
+        return True
+
+    async def chart(self, chart: str, period: str) -> imageopt.OptimizedImage:
+        """Returns the requested chart, rendering it only if new samples were added"""
+        newest = self.__store.newest()
+        cached = self.__charts.get((chart, period), None)
+        if cached is None or cached[0] != newest:
+            title, fields, y_labels = SOLAR_CHARTS[chart]
+            since = time.time() - SOLAR_PERIODS[period]
+            series = {name: self.__store.series(field, since) for field, name in fields.items()}
+            render = asyncio.get_running_loop().run_in_executor(None,
+                _render_chart, title, series, y_labels, self.__allow_webp)
+            cached = self.__charts[(chart, period)] = (newest, render)
+
+        try:
+            return await cached[1]
+        except Exception:
+            self.__charts.pop((chart, period), None)
+            raise
+
+    @property
+    def chart_count(self) -> int:
+        """Returns the number of charts kept"""
+        return len(self.__charts)
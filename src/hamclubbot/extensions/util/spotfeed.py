@@ -0,0 +1,252 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements change tracking and subscription matching for the POTA spot feed"""
+
+import json
+import logging
+import time
+
+from hamclubbot.extensions.util import persistentstore
+
+logger = logging.getLogger(__name__)
+
+# Current activator spots published by pota.app
+SPOTS_URL = "https://api.pota.app/spot/activator"
+
+# Amateur bands as (lower kHz, upper kHz, name)
+BANDS = [
+    (1800, 2000, "160m"),
+    (3500, 4000, "80m"),
+    (5330, 5410, "60m"),
+    (7000, 7300, "40m"),
+    (10100, 10150, "30m"),
+    (14000, 14350, "20m"),
+    (18068, 18168, "17m"),
+    (21000, 21450, "15m"),
+    (24890, 24990, "12m"),
+    (28000, 29700, "10m"),
+    (50000, 54000, "6m"),
+    (144000, 148000, "2m"),
+    (420000, 450000, "70cm"),
+]
+
+def band_for(frequency: str | float | None) -> str | None:
+    """Returns the name of the band containing the given frequency (in kHz)"""
+    try:
+        khz = float(frequency) if frequency is not None else None
+    except ValueError:
+        return None
+    if khz is None:
+        return None
+    for lower, upper, name in BANDS:
+        if lower <= khz <= upper:
+            return name
+    return None
+
+def program_for(reference: str | None) -> str | None:
+    """Returns the program (e.g. US, VE) for the given park reference (e.g. US-8081)"""
+    if not reference or "-" not in reference:
+        return None
+    return reference.split("-", 1)[0].upper()
+
+def mode_for(mode: str | None) -> str | None:
+    """Returns the normalized mode of a spot"""
+    return mode.strip().upper() if mode and mode.strip() else None
+
+class SpotDiff:
+    """
+    Tracks the active spots between polls of the spot feed.
+
+    Each poll is compared against the previous one by spot id, so the work done per
+    poll is proportional to the number of spots rather than the number of subscribers.
+    """
+
+    def __init__(self):
+        self.__seen = dict[int, tuple]()
+        self.__primed = False
+
+    @staticmethod
+    def __signature(spot: dict) -> tuple:
+        return (spot.get('activator', None), spot.get('frequency', None),
+            spot.get('mode', None), spot.get('reference', None), spot.get('comments', None))
+
+    def update(self, spots: list[dict]) -> list[dict]:
+        """
+        Records the latest poll of the spot feed.
+
+        Returns:
+            list: The spots which are new or changed since the previous poll. The first
+                poll only establishes a baseline and returns no spots.
+        """
+        changed = []
+        current = dict[int, tuple]()
+        for spot in spots:
+            spot_id = spot.get('spotId', None)
+            if spot_id is None:
+                continue
+            signature = current[spot_id] = SpotDiff.__signature(spot)
+            if self.__seen.get(spot_id, None) != signature:
+                changed.append(spot)
+
+        self.__seen = current
+        if not self.__primed:
+            self.__primed = True
+            return []
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.__seen)
+
+class SubscriptionIndex:
+    """
+    Maps spot attributes to the channels subscribed to them.
+
+    Each channel has a single subscription filtering on program, band and mode, where
+    None matches any value. Subscriptions are indexed by their filter so matching a
+    spot takes a fixed number of lookups regardless of the number of subscriptions.
+    """
+
+    def __init__(self):
+        self.__by_filter = dict[tuple, set[int]]()
+        self.__by_channel = dict[int, tuple]()
+
+    def add(self, channel_id: int, program: str | None = None, band: str | None = None,
+        mode: str | None = None) -> None:
+        """Subscribes the channel, replacing any existing subscription for it"""
+        self.remove(channel_id)
+        key = (program.upper() if program else None, band.lower() if band else None,
+            mode_for(mode))
+        self.__by_channel[channel_id] = key
+        self.__by_filter.setdefault(key, set()).add(channel_id)
+
+    def remove(self, channel_id: int) -> bool:
+        """Removes the subscription for the channel. Returns False if there wasn't one"""
+        key = self.__by_channel.pop(channel_id, None)
+        if key is None:
+            return False
+        channels = self.__by_filter[key]
+        channels.discard(channel_id)
+        if not channels:
+            del self.__by_filter[key]
+        return True
+
+    def get(self, channel_id: int) -> tuple | None:
+        """Returns the (program, band, mode) filter for the channel, if subscribed"""
+        return self.__by_channel.get(channel_id, None)
+
+    def match(self, spot: dict) -> set[int]:
+        """Returns the channels whose subscription matches the given spot"""
+        channels = set[int]()
+        for program in (program_for(spot.get('reference', None)), None):
+            for band in (band_for(spot.get('frequency', None)), None):
+                for mode in (mode_for(spot.get('mode', None)), None):
+                    channels.update(self.__by_filter.get((program, band, mode), ()))
+        return channels
+
+    def __len__(self) -> int:
+        return len(self.__by_channel)
+
+class SpotFeed:
+    """
+    Tracks the spot feed and the channels subscribed to it.
+
+    Subscriptions are persisted in the guild store of each guild (as "spots:{channel_id}")
+    and loaded into a SubscriptionIndex once the bot knows its guilds.
+    """
+
+    def __init__(self, dbpath: str):
+        self.__dbpath = dbpath
+        self.__diff = SpotDiff()
+        self.__subscriptions = SubscriptionIndex()
+        # Guild of each subscribed channel, needed to drop a channel the bot can't post to
+        self.__guilds = dict[int, int]()
+        self.__loaded = False
+
+    def load(self, guild_ids: list[int]) -> None:
+        """Loads the subscriptions of the given guilds, unless already loaded"""
+        if self.__loaded:
+            return
+        for guild_id in guild_ids:
+            ps = persistentstore.PersistentGuildStore(guild_id, self.__dbpath)
+            for key in ps.get_keys("spots:"):
+                record = json.loads(ps.get_value(key) or "{}")
+                channel_id = int(key.split(":", 1)[1])
+                self.__subscriptions.add(channel_id, record.get('program', None),
+                    record.get('band', None), record.get('mode', None))
+                self.__guilds[channel_id] = guild_id
+        self.__loaded = True
+        logger.info("loaded %d spot subscriptions", len(self.__subscriptions))
+
+    def subscribe(self, guild_id: int, channel_id: int, user_id: int,
+        filters: dict[str, str | None] | None = None) -> dict:
+        """
+        Subscribes the channel, replacing any existing subscription.
+
+        Args:
+            filters (dict): Optionally only match spots with the given 'program', 'band'
+                and/or 'mode'
+
+        Returns:
+            dict: The subscription record, with the normalized filters
+        """
+        filters = filters if filters else {}
+        record = {
+            'program': (filters.get('program', None) or "").upper() or None,
+            'band': filters.get('band', None) or None,
+            'mode': mode_for(filters.get('mode', None)),
+            'last_updated': {
+                'user_id': user_id,
+                'timestamp': time.time()
+            }
+        }
+        ps = persistentstore.PersistentGuildStore(guild_id, self.__dbpath)
+        ps.set_value(f"spots:{channel_id}", json.dumps(record))
+        self.__subscriptions.add(channel_id, record['program'], record['band'], record['mode'])
+        self.__guilds[channel_id] = guild_id
+        return record
+
+    def unsubscribe(self, guild_id: int, channel_id: int) -> bool:
+        """Unsubscribes the channel. Returns False if it wasn't subscribed"""
+        persistentstore.PersistentGuildStore(guild_id, self.__dbpath).delete_value(
+            f"spots:{channel_id}")
+        self.__guilds.pop(channel_id, None)
+        return self.__subscriptions.remove(channel_id)
+
+    def drop(self, channel_id: int) -> bool:
+        """Unsubscribes the channel from whichever guild subscribed it (e.g. because the
+        channel was deleted). Returns False if it wasn't subscribed"""
+        guild_id = self.__guilds.get(channel_id, None)
+        if guild_id is None:
+            return False
+        return self.unsubscribe(guild_id, channel_id)
+
+    def update(self, spots: list[dict]) -> dict[int, list[dict]]:
+        """
+        Records the latest poll of the spot feed.
+
+        Returns:
+            dict: The new or changed spots matching each subscribed channel, keyed by
+                channel id
+        """
+        changed = self.__diff.update(spots)
+        logger.debug("polled %d pota spots, %d new or changed", len(spots), len(changed))
+
+        by_channel = dict[int, list[dict]]()
+        for spot in changed:
+            for channel_id in self.__subscriptions.match(spot):
+                by_channel.setdefault(channel_id, []).append(spot)
+        return by_channel
+
+    @property
+    def spot_count(self) -> int:
+        """Returns the number of active spots"""
+        return len(self.__diff)
+
+    @property
+    def subscription_count(self) -> int:
+        """Returns the number of subscribed channels"""
+        return len(self.__subscriptions)
@@ -0,0 +1,81 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements helpers for rendering (portions of) SVG images to PNG"""
+
+import re
+
+import cairosvg
+
+_SVG_TAG = re.compile(rb"<svg\b[^>]*>", re.DOTALL)
+_SIZE_ATTRS = re.compile(
+    rb"\s(?:width|height|viewBox|preserveAspectRatio)\s*=\s*(?:\"[^\"]*\"|'[^']*')")
+_NUMBER = re.compile(rb"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+def _attr(tag: bytes, name: bytes) -> bytes | None:
+    match = re.search(rb"\s" + name + rb"\s*=\s*(?:\"([^\"]*)\"|'([^']*)')", tag)
+    if not match:
+        return None
+    return match.group(1) if match.group(1) is not None else match.group(2)
+
+def view_box(svg: bytes) -> tuple[float, float, float, float]:
+    """Returns the (x, y, width, height) view box of the SVG document"""
+    tag = _SVG_TAG.search(svg)
+    if not tag:
+        raise ValueError("not an svg document")
+
+    box = _attr(tag.group(0), b"viewBox")
+    if box:
+        x, y, width, height = (float(n) for n in _NUMBER.findall(box)[:4])
+        return x, y, width, height
+
+    width, height = _attr(tag.group(0), b"width"), _attr(tag.group(0), b"height")
+    if not width or not height:
+        raise ValueError("svg document has no viewBox or size")
+    return 0.0, 0.0, float(_NUMBER.match(width).group(0)), float(_NUMBER.match(height).group(0))
+
+def crop(svg: bytes, box: tuple[float, float, float, float]) -> bytes:
+    """
+    Crops the SVG document to a portion of its view box.
+
+    Args:
+        svg (bytes): The SVG document
+        box (tuple): The (left, top, right, bottom) of the crop as fractions (0 to 1)
+            of the document's width and height
+
+    Returns:
+        bytes: The cropped SVG document
+    """
+    x, y, width, height = view_box(svg)
+    left, top, right, bottom = box
+    crop_box = (x + left * width, y + top * height,
+        (right - left) * width, (bottom - top) * height)
+
+    tag = _SVG_TAG.search(svg)
+    new_tag = _SIZE_ATTRS.sub(b"", tag.group(0))
+    left, top, width, height = crop_box
+    attrs = f' viewBox="{left:g} {top:g} {width:g} {height:g}" width="{width:g}" \
+height="{height:g}"'.encode("ascii")
+    new_tag = new_tag[:4] + attrs + new_tag[4:]
+    return svg[:tag.start()] + new_tag + svg[tag.end():]
+
+def render_png(svg: bytes, box: tuple[float, float, float, float] | None = None,
+    width: int | None = None) -> bytes:
+    """
+    Renders the SVG document to a PNG. This is CPU intensive, call it from an executor.
+
+    Args:
+        svg (bytes): The SVG document
+        box (tuple): Optionally crop to (left, top, right, bottom) fractions of the document
+        width (int): Optionally scale the PNG to this width in pixels, keeping the aspect ratio.
+            By default the PNG is the width of the whole document, even when cropped
+    """
+    if box:
+        if width is None:
+            # crop() sizes the document to the crop, which would shrink it
+            width = round(view_box(svg)[2])
+        svg = crop(svg, box)
+    return cairosvg.svg2png(bytestring=svg, output_width=width)
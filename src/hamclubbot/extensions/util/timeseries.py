@@ -0,0 +1,202 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Implements a compact, fixed size store of time series samples"""
+
+import array
+import json
+import logging
+import math
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"HCTS"
+_HEADER = struct.Struct("<4sI")
+
+class RingBuffer:
+    """
+    Stores up to 'capacity' rows of float samples in flat arrays, overwriting the oldest
+    row once full. Each row has a timestamp and one value per field.
+    """
+
+    def __init__(self, width: int, capacity: int):
+        self.__width = width
+        self.__capacity = capacity
+        self.__timestamps = array.array("d", bytes(8 * capacity))
+        self.__values = array.array("f", bytes(4 * capacity * width))
+        self.__head = 0
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def append(self, timestamp: float, values: list[float]) -> None:
+        """Appends a row, overwriting the oldest row if the buffer is full"""
+        self.__timestamps[self.__head] = timestamp
+        offset = self.__head * self.__width
+        self.__values[offset:offset + self.__width] = array.array("f", values)
+        self.__head = (self.__head + 1) % self.__capacity
+        self.__count = min(self.__count + 1, self.__capacity)
+
+    def __index(self, i: int) -> int:
+        return (self.__head - self.__count + i) % self.__capacity
+
+    def oldest(self) -> float | None:
+        """Returns the timestamp of the oldest row, or None if empty"""
+        return self.__timestamps[self.__index(0)] if self.__count else None
+
+    def newest(self) -> float | None:
+        """Returns the timestamp of the newest row, or None if empty"""
+        return self.__timestamps[self.__index(self.__count - 1)] if self.__count else None
+
+    def series(self, field: int, since: float = 0) -> list[tuple[float, float]]:
+        """Returns the (timestamp, value) pairs of a field, oldest first, skipping missing
+        values"""
+        result = []
+        for i in range(self.__count):
+            index = self.__index(i)
+            timestamp = self.__timestamps[index]
+            value = self.__values[index * self.__width + field]
+            if timestamp >= since and not math.isnan(value):
+                result.append((timestamp, value))
+        return result
+
+    def to_bytes(self) -> tuple[dict, bytes]:
+        """Returns the state of the buffer as (metadata, payload)"""
+        return ({'head': self.__head, 'count': self.__count},
+            self.__timestamps.tobytes() + self.__values.tobytes())
+
+    def from_bytes(self, meta: dict, payload: bytes) -> None:
+        """Restores the state of the buffer from to_bytes()"""
+        split = 8 * self.__capacity
+        self.__timestamps = array.array("d", payload[:split])
+        self.__values = array.array("f", payload[split:])
+        self.__head = meta['head']
+        self.__count = meta['count']
+
+    @property
+    def payload_size(self) -> int:
+        """Returns the size, in bytes, of the payload returned by to_bytes()"""
+        return self.__capacity * (8 + 4 * self.__width)
+
+class TimeSeriesStore:
+    """
+    Stores samples of several fields over time.
+
+    Samples are kept in a ring buffer of raw samples, and are also averaged into
+    fixed length buckets kept in a longer lived rollup ring buffer. The store can be
+    persisted to, and restored from, a single file.
+    """
+
+    def __init__(self, fields: list[str], raw_capacity: int, rollup_seconds: int,
+        rollup_capacity: int):
+        self.__fields = list(fields)
+        self.__raw = RingBuffer(len(fields), raw_capacity)
+        self.__rollup = RingBuffer(len(fields), rollup_capacity)
+        self.__rollup_seconds = rollup_seconds
+        self.__bucket_start = 0.0
+        self.__sums = [0.0] * len(fields)
+        self.__counts = [0] * len(fields)
+
+    @property
+    def fields(self) -> list[str]:
+        """Returns the names of the fields stored"""
+        return list(self.__fields)
+
+    def newest(self) -> float | None:
+        """Returns the timestamp of the newest sample, or None if empty"""
+        return self.__raw.newest()
+
+    def add(self, timestamp: float, values: dict[str, float | None]) -> None:
+        """Adds a sample. Fields missing from 'values' are recorded as missing"""
+        row = [math.nan if values.get(field, None) is None else float(values[field])
+            for field in self.__fields]
+        self.__raw.append(timestamp, row)
+
+        bucket_start = timestamp - timestamp % self.__rollup_seconds
+        if bucket_start != self.__bucket_start:
+            self.__flush()
+            self.__bucket_start = bucket_start
+        for i, value in enumerate(row):
+            if not math.isnan(value):
+                self.__sums[i] += value
+                self.__counts[i] += 1
+
+    def __flush(self):
+        """Moves the average of the current bucket into the rollup buffer"""
+        if any(self.__counts):
+            self.__rollup.append(self.__bucket_start,
+                [s / c if c else math.nan for s, c in zip(self.__sums, self.__counts)])
+        self.__sums = [0.0] * len(self.__fields)
+        self.__counts = [0] * len(self.__fields)
+
+    def series(self, field: str, since: float = 0) -> list[tuple[float, float]]:
+        """
+        Returns the (timestamp, value) samples of a field since the given time.
+
+        Raw samples are returned for as far back as they go, preceded by the rollup
+        averages of any earlier buckets.
+        """
+        index = self.__fields.index(field)
+        oldest = self.__raw.oldest()
+        if oldest is None:
+            return []
+
+        # Only buckets which ended before the oldest raw sample add anything
+        older = [(timestamp, value) for timestamp, value in self.__rollup.series(index, since)
+            if timestamp + self.__rollup_seconds <= oldest]
+        return older + self.__raw.series(index, since)
+
+    def save(self, path: str) -> None:
+        """Persists the store to the given file, replacing it atomically"""
+        raw_meta, raw_payload = self.__raw.to_bytes()
+        rollup_meta, rollup_payload = self.__rollup.to_bytes()
+        meta = json.dumps({
+            'fields': self.__fields,
+            'raw': raw_meta,
+            'rollup': rollup_meta,
+            'bucket_start': self.__bucket_start,
+            'sums': self.__sums,
+            'counts': self.__counts,
+        }).encode("utf-8")
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as stream:
+            stream.write(_HEADER.pack(_MAGIC, len(meta)))
+            stream.write(meta)
+            stream.write(raw_payload)
+            stream.write(rollup_payload)
+        os.replace(temp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Restores the store from the given file. Returns False if it could not be used"""
+        try:
+            with open(path, "rb") as stream:
+                magic, meta_len = _HEADER.unpack(stream.read(_HEADER.size))
+                meta = json.loads(stream.read(meta_len)) if magic == _MAGIC else None
+                raw_payload = stream.read(self.__raw.payload_size)
+                rollup_payload = stream.read(self.__rollup.payload_size)
+                trailing = stream.read(1)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, struct.error) as ex:
+            logger.warning("unable to load time series from %s: %s", path, ex)
+            return False
+
+        if not meta or meta['fields'] != self.__fields or \
+            len(raw_payload) != self.__raw.payload_size or \
+            len(rollup_payload) != self.__rollup.payload_size or trailing:
+            logger.warning("ignoring incompatible time series in %s", path)
+            return False
+
+        self.__raw.from_bytes(meta['raw'], raw_payload)
+        self.__rollup.from_bytes(meta['rollup'], rollup_payload)
+        self.__bucket_start = meta['bucket_start']
+        self.__sums = meta['sums']
+        self.__counts = meta['counts']
+        return True
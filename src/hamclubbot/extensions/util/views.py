@@ -6,6 +6,8 @@
 
 """Implements common views for use in the discord bot"""
 
+from collections.abc import Callable
+
 import discord
 
 class YesNoConfirmationView(discord.ui.View):
@@ -30,3 +32,49 @@ class YesNoConfirmationView(discord.ui.View):
         """Callback for handling the 'yes' button click"""
         self.__selection = "no"
         self.stop()
+
+class PageView(discord.ui.View):
+    """Implements a view paging through embeds with previous/next buttons"""
+    def __init__(self, page_count: int, render: Callable[[int], discord.Embed], **kwargs):
+        """
+        Constructor
+
+        Args:
+            page_count (int): The number of pages
+            render (Callable): Called with a page number (starting at 0) to render that page
+        """
+        super().__init__(**kwargs)
+        self.__page = 0
+        self.__page_count = max(1, page_count)
+        self.__render = render
+        self.__update_buttons()
+
+    @property
+    def page(self) -> int:
+        """Returns the page currently displayed"""
+        return self.__page
+
+    def render(self) -> discord.Embed:
+        """Renders the page currently displayed"""
+        return self.__render(self.__page)
+
+    def __update_buttons(self):
+        self.previous_callback.disabled = self.__page <= 0
+        self.next_callback.disabled = self.__page >= self.__page_count - 1
+
+    async def __show(self, interaction: discord.Interaction):
+        self.__update_buttons()
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="Previous")
+    async def previous_callback(self, _button: discord.ui.Button,
+        interaction: discord.Interaction):
+        """Callback for handling the 'previous' button click"""
+        self.__page = max(0, self.__page - 1)
+        await self.__show(interaction)
+
+    @discord.ui.button(label="Next")
+    async def next_callback(self, _button: discord.ui.Button, interaction: discord.Interaction):
+        """Callback for handling the 'next' button click"""
+        self.__page = min(self.__page_count - 1, self.__page + 1)
+        await self.__show(interaction)
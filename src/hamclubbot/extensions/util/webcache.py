@@ -6,14 +6,62 @@
 
 """Implements a basic cache for web requests"""
 
+import contextlib
+import dataclasses
 import logging
 import time
 import asyncio
+import urllib.parse
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+from hamclubbot.extensions.util import circuitbreaker
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of concurrent requests made to a single upstream host
+MAX_WORKERS_PER_HOST = 4
+
+class UpstreamUnavailable(Exception):
+    """Raised when content can't be retrieved from the upstream host and nothing is cached"""
+    def __init__(self, host: str, reason: str):
+        super().__init__(f"{host} is unavailable: {reason}")
+        self.host = host
+        self.reason = reason
+
+@dataclasses.dataclass(frozen=True)
+class _Upstream:
+    """Bounded worker pool and circuit breaker shared by all requests to a single host"""
+    executor: ThreadPoolExecutor
+    breaker: circuitbreaker.CircuitBreaker
+
+_upstreams = dict[str, _Upstream]()
+
+def _upstream(host: str) -> _Upstream:
+    upstream = _upstreams.get(host, None)
+    if upstream is None:
+        upstream = _upstreams[host] = _Upstream(
+            ThreadPoolExecutor(max_workers=MAX_WORKERS_PER_HOST,
+                thread_name_prefix=f"webcache-{host}"),
+            circuitbreaker.CircuitBreaker(host))
+    return upstream
+
+def breakers() -> list[circuitbreaker.CircuitBreaker]:
+    """Returns the circuit breakers for all upstream hosts contacted so far"""
+    return [upstream.breaker for upstream in _upstreams.values()]
+
+_caches = weakref.WeakSet()
+
+def cache_usage() -> tuple[int, int]:
+    """Returns the number of entries, and their total content size in bytes, of all caches"""
+    entries, size = 0, 0
+    for cache in list(_caches):
+        entries += len(cache)
+        size += cache.content_size()
+    return entries, size
+
 class CacheEntry:
     """Represents an entry in the WebCache"""
 
@@ -59,21 +107,50 @@ class CacheEntry:
 class WebCache:
     """Implements a simple cache for web content"""
 
-    def __init__(self, cache_expiry_seconds = 900):
+    def __init__(self, cache_expiry_seconds = 900, timeout_seconds = 10):
         """
         Constructor
 
         Args:
             cache_expiry_seconds (int): The number of seconds before a cache entry expires
             (default = 900 (15 Minutes))
+            timeout_seconds (int): The number of seconds to wait when connecting to, or
+            reading from, the upstream host. The whole response must arrive within twice
+            this once a worker starts the request (default = 10)
         """
         self.__cache = dict[str, CacheEntry]()
         self.__cache_expiry_seconds = cache_expiry_seconds
+        self.__timeout_seconds = timeout_seconds
+        self.__refreshes = dict[str, asyncio.Task]()
+        _caches.add(self)
 
-    async def get_url(self, url: str) -> CacheEntry:
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+    def content_size(self) -> int:
+        """Returns the total size, in bytes, of the content of all cache entries"""
+        return sum(len(cache_entry.content) for cache_entry in self.__cache.values())
+
+    async def get_url(self, url: str, allow_stale: bool = False,
+        limit: asyncio.Semaphore | None = None) -> CacheEntry:
         """
         Returns the cache entry for the given URL.
 
+        If the upstream host is failing (or its circuit breaker is open), the last good
+        cache entry is returned even if it has expired.
+
+        Args:
+            url (str): The URL to retrieve
+            allow_stale (bool): Return an expired cache entry immediately, and refresh it
+                in the background, rather than waiting for it to be retrieved
+                (default = False)
+            limit (asyncio.Semaphore): Held while the URL is retrieved, including any
+                background refresh, to bound the number of requests made at once by a
+                caller (default = None, unbounded)
+
+        Raises:
+            UpstreamUnavailable: The upstream host is failing and the URL is not cached
+
         Returns:
             dict: Dictionary of the cache entry. All cache entries have a 'timestamp' and a
                 'content' key. The 'timestamp' is the time the cache entry was created. The
@@ -82,22 +159,103 @@ class WebCache:
                 the 'extra' content using the cacheRelatedData method.
         """
         # Check if URL is cached and the cache has not yet expired.
-        if url in self.__cache:
-            cache_entry = self.__cache[url]
+        cache_entry = self.__cache.get(url, None)
+        if cache_entry:
             timestamp = time.time()
             if timestamp < cache_entry.expires_at:
                 logger.debug("returning cached content for %s", url)
                 # Cache has not expired, returned cached content
                 return cache_entry
 
+            if allow_stale:
+                logger.debug("returning stale content for %s while refreshing", url)
+                if url not in self.__refreshes:
+                    refresh = self.__refreshes[url] = asyncio.ensure_future(
+                        self.__refresh(url, limit))
+                    refresh.add_done_callback(lambda _: self.__refreshes.pop(url, None))
+                return cache_entry
+
+        async with limit or contextlib.nullcontext():
+            return await self.__retrieve(url, cache_entry)
+
+    async def __refresh(self, url: str, limit: asyncio.Semaphore | None) -> None:
+        """Retrieves the URL in the background, replacing its cache entry"""
+        try:
+            async with limit or contextlib.nullcontext():
+                await self.__retrieve(url, self.__cache.get(url, None))
+        except UpstreamUnavailable:
+            pass
+
+    async def __retrieve(self, url: str, cache_entry: CacheEntry | None) -> CacheEntry:
+        """Retrieves the URL from the upstream host and adds it to the cache"""
         # Cache has either expired or URL is not in cache. Retrieve it
-        # and add to cache
+        # and add to cache, unless the host is known to be failing
+        host = urllib.parse.urlsplit(url).hostname or ""
+        upstream = _upstream(host)
+        if not upstream.breaker.allow():
+            return self.__stale_or_raise(url, host, cache_entry, "circuit breaker open")
+
         logger.debug("retrieving content for %s", url)
-        resp = await asyncio.get_event_loop().run_in_executor(None, requests.get, url)
-        cache_entry = self.__cache[url] = CacheEntry(resp.content, self.__cache_expiry_seconds)
+        try:
+            status_code, content = await asyncio.get_running_loop().run_in_executor(
+                upstream.executor, self.__fetch, url)
+        except requests.RequestException as ex:
+            upstream.breaker.record_failure()
+            return self.__stale_or_raise(url, host, cache_entry, f"request failed: {ex!r}")
+        except asyncio.CancelledError:
+            # The outcome is unknown, so don't hold up the next trial of a half-open breaker
+            upstream.breaker.release()
+            raise
+
+        if status_code >= 500:
+            upstream.breaker.record_failure()
+            return self.__stale_or_raise(url, host, cache_entry, f"server error {status_code}")
+
+        # Client errors are cached, the body holds the error message from the host
+        upstream.breaker.record_success()
+        cache_entry = self.__cache[url] = CacheEntry(content, self.__cache_expiry_seconds)
+
+        return cache_entry
 
+    def __fetch(self, url: str) -> tuple[int, bytes]:
+        """
+        Retrieves the URL on an upstream worker thread, returning the status code and content.
+
+        The time limit starts once a worker picks up the request, so time spent queued
+        behind other requests to the same host never counts as an upstream failure.
+
+        Raises:
+            requests.RequestException: The request failed or timed out
+        """
+        deadline = time.monotonic() + self.__timeout_seconds * 2
+        with requests.get(url, timeout=self.__timeout_seconds, stream=True) as resp:
+            chunks = list[bytes]()
+            for chunk in resp.iter_content(chunk_size=65536):
+                if time.monotonic() > deadline:
+                    raise requests.Timeout(
+                        f"incomplete response after {self.__timeout_seconds * 2} seconds")
+                chunks.append(chunk)
+            return resp.status_code, b"".join(chunks)
+
+    def __stale_or_raise(self, url: str, host: str, cache_entry: CacheEntry | None,
+        reason: str) -> CacheEntry:
+        """Returns the last good cache entry after a failure, raising if there isn't one"""
+        if cache_entry is None:
+            logger.warning("unable to retrieve %s: %s", url, reason)
+            raise UpstreamUnavailable(host, reason)
+
+        logger.warning("unable to retrieve %s, returning stale content: %s", url, reason)
         return cache_entry
 
+    def is_cached(self, url: str) -> bool:
+        """Returns True if the URL is cached, whether or not the entry has expired"""
+        return url in self.__cache
+
+    def is_fresh(self, url: str) -> bool:
+        """Returns True if the URL is cached and has not expired (i.e. get_url won't fetch it)"""
+        cache_entry = self.__cache.get(url, None)
+        return cache_entry is not None and time.time() < cache_entry.expires_at
+
     def clear_cache(self, url: str) -> None:
         """Clears the cache entry for the given URL. Next time a request is made,
         the URL will be directly retrieved"""
@@ -0,0 +1,30 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Fixtures shared by the tests"""
+
+import dataclasses
+from collections.abc import Callable
+from types import ModuleType
+
+import pytest
+
+@dataclasses.dataclass
+class FakeClock:
+    """Replaces time.monotonic() with a clock advanced by the test"""
+    now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture(name="fake_clock")
+def fixture_fake_clock(monkeypatch) -> Callable[[ModuleType], FakeClock]:
+    """Returns a function installing a FakeClock as time.monotonic() of the given module"""
+    def install(module: ModuleType) -> FakeClock:
+        clock = FakeClock()
+        monkeypatch.setattr(module.time, "monotonic", clock)
+        return clock
+    return install
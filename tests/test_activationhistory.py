@@ -0,0 +1,67 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.activationhistory"""
+
+import pytest
+
+from hamclubbot.extensions.util.activationhistory import ActivationHistory
+
+def activation(qso_date: str, callsign: str, cw: int = 10, data: int = 0,
+    phone: int = 0) -> dict:
+    """Returns an activation as published by pota.app"""
+    return {'qso_date': qso_date, 'activeCallsign': callsign, 'totalQSOs': cw + data + phone,
+        'qsosCW': cw, 'qsosDATA': data, 'qsosPHONE': phone}
+
+@pytest.fixture(name="history")
+def fixture_history(tmp_path) -> ActivationHistory:
+    """Returns a history holding two activations of US-8081"""
+    history = ActivationHistory(str(tmp_path / "pota.db"))
+    history.merge("US-8081", [activation("20250102", "N0CALL"),
+        activation("20250101", "K0ABC", phone=12)], complete=True)
+    return history
+
+def test_merge_and_query(history):
+    """Merged activations are counted, aggregated and listed newest first"""
+    assert history.count("US-8081") == 2
+    assert history.latest_date("US-8081") == 20250102
+    assert history.synced_at("US-8081") > 0
+    assert history.is_complete("US-8081")
+    assert [a['activeCallsign'] for a in history.recent("US-8081")] == ["N0CALL", "K0ABC"]
+    assert history.recent("US-8081", offset=1, limit=1)[0]['totalQSOs'] == 22
+
+    aggregates = history.aggregates("US-8081")
+    assert aggregates['activations'] == 2
+    assert aggregates['activators'] == 2
+    assert aggregates['qsos'] == 32
+    assert (aggregates['first'], aggregates['last']) == (20250101, 20250102)
+
+def test_unknown_park(history):
+    """A park without stored activations has no history"""
+    assert history.count("US-0001") == 0
+    assert history.latest_date("US-0001") is None
+    assert history.synced_at("US-0001") == 0
+    assert not history.is_complete("US-0001")
+    assert not history.recent("US-0001")
+
+def test_merge_updates_existing_activations(history):
+    """Merging an activation again replaces its QSO counts"""
+    # pota.app keeps adding QSOs to an activation while logs are uploaded
+    assert history.merge("US-8081", [activation("20250102", "N0CALL", cw=15, data=3),
+        activation("20250101", "K0ABC", phone=12)]) == 1
+    assert history.count("US-8081") == 2
+    assert history.recent("US-8081", limit=1)[0]['totalQSOs'] == 18
+    assert history.aggregates("US-8081")['data'] == 3
+
+def test_merge_tracks_completeness(history):
+    """Merges record whether the stored history is complete, None keeps it as it was"""
+    history.merge("US-8081", [activation("20250103", "W0XYZ")])
+    assert history.is_complete("US-8081")
+    history.merge("US-8081", [activation("20250301", "W0XYZ")], complete=False)
+    assert not history.is_complete("US-8081")
+
+    history.merge("US-0001", [activation("20250101", "N0CALL")])
+    assert not history.is_complete("US-0001")
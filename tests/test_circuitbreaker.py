@@ -0,0 +1,89 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.circuitbreaker"""
+
+import pytest
+
+from hamclubbot.extensions.util import circuitbreaker
+from hamclubbot.extensions.util.circuitbreaker import CircuitBreaker
+
+@pytest.fixture(name="clock")
+def fixture_clock(fake_clock):
+    """Advances the clock of the circuitbreaker module under test control"""
+    return fake_clock(circuitbreaker)
+
+@pytest.fixture(name="breaker")
+def fixture_breaker(clock) -> CircuitBreaker:
+    """Returns a breaker which has opened and waited until half-open"""
+    # Open, then wait until half-open
+    breaker = CircuitBreaker("example.com", failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 60
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    return breaker
+
+def test_opens_after_consecutive_failures(clock):
+    """The breaker opens only after consecutive failures"""
+    breaker = CircuitBreaker("example.com", failure_threshold=3, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 59
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_half_open_allows_single_trial(breaker):
+    """A half-open breaker allows a single trial call"""
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert "rejected=1" in str(breaker)
+
+def test_successful_trial_closes(breaker):
+    """A successful trial closes the breaker"""
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    assert breaker.allow()
+
+def test_failed_trial_reopens(breaker, clock):
+    """A failed trial opens the breaker again"""
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow()
+
+def test_released_trial_allows_another(breaker):
+    """A released trial allows another trial"""
+    # e.g. the trial call was cancelled before it completed
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+def test_abandoned_trial_expires(breaker, clock):
+    """A trial without an outcome stops blocking after reset_seconds"""
+    assert breaker.allow()
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
@@ -0,0 +1,81 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.logqueue"""
+
+import atexit
+import logging
+import logging.handlers
+
+import pytest
+
+from hamclubbot.extensions.util import logqueue
+from hamclubbot.extensions.util.logqueue import RateLimitFilter
+
+@pytest.fixture(name="clock")
+def fixture_clock(fake_clock):
+    """Advances the clock of the logqueue module under test control"""
+    return fake_clock(logqueue)
+
+def record(msg: str, *args, name: str = "test", level: int = logging.DEBUG) -> logging.LogRecord:
+    """Returns a log record of the given logger and message"""
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_per_second_window_is_per_logger_and_message(clock):
+    """Each logger and message format has its own allowance, renewed every second"""
+    limiter = RateLimitFilter(per_second=2)
+    assert limiter.filter(record("hit %s", 1))
+    assert limiter.filter(record("hit %s", 2))
+    assert not limiter.filter(record("hit %s", 3))
+    assert limiter.filter(record("miss %s", 1))
+    assert limiter.filter(record("hit %s", 1, name="other"))
+
+    clock.now += 0.5
+    assert not limiter.filter(record("hit %s", 4))
+    clock.now += 0.5
+    assert limiter.filter(record("hit %s", 5))
+
+def test_sample_rate(monkeypatch):
+    """Only the given fraction of records is emitted"""
+    samples = iter([0.1, 0.5, 0.9])
+    monkeypatch.setattr(logqueue.random, "random", lambda: next(samples))
+    limiter = RateLimitFilter(sample_rate=0.5)
+    assert [limiter.filter(record("hit")) for _ in range(3)] == [True, False, False]
+
+@pytest.mark.usefixtures("clock")
+def test_warnings_are_never_dropped():
+    """Records of level WARNING and above pass any limit"""
+    limiter = RateLimitFilter(per_second=1, sample_rate=0)
+    assert not limiter.filter(record("hit"))
+    for _ in range(5):
+        assert limiter.filter(record("hit", level=logging.WARNING))
+        assert limiter.filter(record("hit", level=logging.ERROR))
+
+def test_install_moves_handlers_behind_queue(monkeypatch):
+    """install() replaces the handlers of each logger with a queue feeding them"""
+    # Leave the handlers of the root logger (e.g. pytest's) alone
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    logger = logging.getLogger("hamclubbot.tests.logqueue")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    handler = logging.handlers.BufferingHandler(capacity=100)
+    logger.addHandler(handler)
+
+    listeners = logqueue.install({'rateLimits': {logger.name: {'per_second': 1}}})
+    try:
+        assert len(listeners) == 1
+        assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+        logger.debug("queued %d", 1)
+        logger.debug("queued %d", 2)
+    finally:
+        for listener in listeners:
+            atexit.unregister(listener.stop)
+            listener.stop()
+        logger.handlers.clear()
+        logger.filters.clear()
+
+    # The rate limit applies before the queue, the handler sees only the first record
+    assert [r.getMessage() for r in handler.buffer] == ["queued 1"]
@@ -0,0 +1,70 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.parkcatalog"""
+
+import pytest
+
+from hamclubbot.extensions.util.parkcatalog import ParkCatalog, parse_csv
+
+CSV = b"""\xef\xbb\xbf\
+"reference","name","active","entityId","locationDesc","latitude","longitude","grid"
+"US-8081","Mount Rainier National Park","1","291","US-WA","46.85","-121.75","CN96"
+"US-0001","Acadia National Park","1","291","US-ME","44.31","-68.2034","FN54"
+"US-0002","Adams National Historical Park","0","291","US-MA","","","FN42"
+"""
+
+@pytest.fixture(name="catalog")
+def fixture_catalog(tmp_path) -> ParkCatalog:
+    """Returns a catalog holding the parks in CSV"""
+    catalog = ParkCatalog(str(tmp_path / "pota.db"))
+    catalog.replace(parse_csv(CSV))
+    return catalog
+
+def test_parse_csv():
+    """The bulk park list is parsed into park dictionaries"""
+    parks = parse_csv(CSV)
+    assert [park['reference'] for park in parks] == ["US-8081", "US-0001", "US-0002"]
+    assert parks[0]['locationDesc'] == "US-WA"
+    assert parks[0]['latitude'] == pytest.approx(46.85)
+    assert parks[2]['active'] == 0
+    assert parks[2]['latitude'] is None
+
+def test_get(catalog):
+    """Parks are looked up by reference, case insensitive"""
+    park = catalog.get("us-8081")
+    assert park['name'] == "Mount Rainier National Park"
+    assert park['grid'] == "CN96"
+    assert catalog.get("US-9999") is None
+    assert catalog.last_refreshed() > 0
+
+def test_complete_by_reference_and_name(catalog):
+    """Autocomplete matches the start of references and names"""
+    assert catalog.park_count == 3
+    assert catalog.complete("us-000") == [
+        ("US-0001", "Acadia National Park"),
+        ("US-0002", "Adams National Historical Park"),
+    ]
+    assert catalog.complete("ad") == [("US-0002", "Adams National Historical Park")]
+    assert catalog.complete("us", limit=1) == [("US-0001", "Acadia National Park")]
+    assert not catalog.complete("xyz")
+
+@pytest.mark.usefixtures("catalog")
+def test_index_is_reloaded_from_database(tmp_path):
+    """A new catalog rebuilds its index from the database"""
+    reopened = ParkCatalog(str(tmp_path / "pota.db"))
+    assert reopened.park_count == 0
+    reopened.load()
+    assert reopened.park_count == 3
+    assert reopened.complete("mount") == [("US-8081", "Mount Rainier National Park")]
+
+def test_needs_refresh(tmp_path):
+    """The catalog needs a refresh once the refresh interval has passed"""
+    catalog = ParkCatalog(str(tmp_path / "pota.db"), refresh_seconds=3600)
+    assert catalog.needs_refresh()
+    catalog.replace(parse_csv(CSV))
+    assert not catalog.needs_refresh()
+    assert ParkCatalog(str(tmp_path / "pota.db"), refresh_seconds=0).needs_refresh()
@@ -0,0 +1,104 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.ratelimit"""
+
+import pytest
+
+from hamclubbot.extensions.util import ratelimit
+
+@pytest.fixture(name="clock")
+def fixture_clock(fake_clock):
+    """Advances the clock of the ratelimit module under test control"""
+    return fake_clock(ratelimit)
+
+def test_bucket_admits_up_to_capacity(clock):
+    """A bucket admits calls until empty, then reports the wait"""
+    bucket = ratelimit.TokenBucket(rate=1, capacity=2)
+    assert ratelimit.admit([bucket]) == 0
+    assert ratelimit.admit([bucket]) == 0
+    assert ratelimit.admit([bucket]) == pytest.approx(1.0)
+
+    clock.now += 0.5
+    assert ratelimit.admit([bucket]) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert ratelimit.admit([bucket]) == 0
+
+def test_bucket_refills_to_capacity(clock):
+    """A bucket refills over time, but never beyond its capacity"""
+    bucket = ratelimit.TokenBucket(rate=1, capacity=2)
+    bucket.consume()
+    assert not bucket.is_full()
+    clock.now += 60
+    assert bucket.is_full()
+    assert ratelimit.admit([bucket]) == 0
+    assert ratelimit.admit([bucket]) == 0
+    assert ratelimit.admit([bucket]) > 0
+
+def test_admit_consumes_only_when_all_buckets_have_tokens(clock):
+    """A rejected call consumes from none of the buckets"""
+    empty = ratelimit.TokenBucket(rate=0.1, capacity=1)
+    empty.consume()
+    full = ratelimit.TokenBucket(rate=1, capacity=1)
+
+    assert ratelimit.admit([full, empty]) == pytest.approx(10.0)
+    assert full.is_full()
+
+    clock.now += 10
+    assert ratelimit.admit([full, empty]) == 0
+    assert not full.is_full()
+
+def test_limiter_buckets_are_per_key(clock):
+    """Each key of a limiter has its own bucket"""
+    limiter = ratelimit.RateLimiter(calls=1, per_seconds=60)
+    assert ratelimit.admit([limiter.bucket("a")]) == 0
+    assert ratelimit.admit([limiter.bucket("a")]) == pytest.approx(60.0)
+    assert ratelimit.admit([limiter.bucket("b")]) == 0
+    assert len(limiter) == 2
+
+    clock.now += 60
+    assert limiter.prune() == 2
+    assert len(limiter) == 0
+
+def test_admission_control_reports_blocking_scope(clock):
+    """Rejected calls report the limit that blocked them"""
+    admission = ratelimit.AdmissionControl.from_config({
+        'guild': {'calls': 10, 'per_seconds': 60},
+        'user': {'calls': 2, 'per_seconds': 60},
+        'commands': {'muf': {'calls': 1, 'per_seconds': 30}},
+    })
+    assert admission.check(1, 100, "muf") is None
+    scope, retry_after = admission.check(1, 100, "muf")
+    assert scope == "command"
+    assert retry_after == pytest.approx(30.0)
+
+    assert admission.check(1, 100, "cond now") is None
+    scope, _ = admission.check(1, 100, "cond now")
+    assert scope == "user"
+    assert admission.check(1, 200, "cond now") is None
+
+    clock.now += 60
+    assert len(admission) == 4
+    assert admission.prune() == 4
+    assert len(admission) == 0
+
+def test_admission_control_without_limits_admits_everything():
+    """Admission control without limits admits every call"""
+    admission = ratelimit.AdmissionControl.from_config(None)
+    for _ in range(100):
+        assert admission.check(1, 100, "muf") is None
+    assert len(admission) == 0
+
+@pytest.mark.parametrize("config, message", [
+    ({'commands': {'muf': None}}, "rateLimits -> commands -> muf: 'calls' is required"),
+    ({'user': {'calls': 5, 'per_seconds': 0}}, "rateLimits -> user: 'calls' and 'per_seconds'"),
+    ({'guild': {'calls': "many"}}, "rateLimits -> guild: 'calls', 'per_seconds' and 'burst'"),
+    ({'guild': {'calls': 5, 'burst': 0.5}}, "rateLimits -> guild: 'burst' must be at least 1"),
+])
+def test_admission_control_rejects_invalid_config(config, message):
+    """Invalid limits are rejected with the path to the limit"""
+    with pytest.raises(ValueError, match=message):
+        ratelimit.AdmissionControl.from_config(config)
@@ -0,0 +1,44 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.roster"""
+
+import pytest
+
+from hamclubbot.extensions.util.roster import ClubRoster
+
+@pytest.fixture(name="roster")
+def fixture_roster(tmp_path) -> ClubRoster:
+    """Returns an empty roster limited to 3 callsigns"""
+    return ClubRoster(str(tmp_path / "pota.db"), max_size=3)
+
+def test_add_and_remove(roster):
+    """Callsigns are added to and removed from each guild's roster"""
+    roster.add(1, "w1aw", user_id=10)
+    roster.add(1, "K2RC", user_id=10)
+    assert roster.callsigns(1) == ["K2RC", "W1AW"]
+    assert roster.contains(1, "w1aw")
+    assert not roster.callsigns(2)
+
+    assert roster.remove(1, "W1AW")
+    assert not roster.remove(1, "W1AW")
+    assert roster.callsigns(1) == ["K2RC"]
+
+def test_complete(roster):
+    """Autocomplete matches the start of callsigns on the roster"""
+    for callsign in ("K2RC", "K2ABC", "W1AW"):
+        roster.add(1, callsign, user_id=10)
+    assert roster.complete(1, "k2") == ["K2ABC", "K2RC"]
+    assert roster.complete(1, "", limit=1) == ["K2ABC"]
+
+def test_max_size(roster):
+    """Each guild's roster is limited to max_size callsigns"""
+    for callsign in ("K2RC", "K2ABC", "W1AW"):
+        roster.add(1, callsign, user_id=10)
+    with pytest.raises(ValueError):
+        roster.add(1, "N0CALL", user_id=10)
+    roster.add(2, "N0CALL", user_id=10)
+    assert roster.max_size == 3
@@ -0,0 +1,120 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.spotfeed"""
+
+from hamclubbot.extensions.util import spotfeed
+from hamclubbot.extensions.util.spotfeed import SpotDiff, SpotFeed, SubscriptionIndex
+
+def spot(spot_id: int, reference: str = "US-8081", frequency: str = "14062",
+    mode: str = "CW", **kwargs) -> dict:
+    """Returns a spot as published by pota.app"""
+    return {'spotId': spot_id, 'activator': "N0CALL", 'reference': reference,
+        'frequency': frequency, 'mode': mode, 'comments': "", **kwargs}
+
+def test_band_program_and_mode():
+    """Spot fields are normalized for matching"""
+    assert spotfeed.band_for("14062") == "20m"
+    assert spotfeed.band_for(7030.5) == "40m"
+    assert spotfeed.band_for("12000") is None
+    assert spotfeed.band_for("unknown") is None
+    assert spotfeed.program_for("ve-0001") == "VE"
+    assert spotfeed.program_for("") is None
+    assert spotfeed.mode_for(" ssb ") == "SSB"
+    assert spotfeed.mode_for("  ") is None
+
+def test_diff_first_poll_is_baseline():
+    """The first poll reports no spots"""
+    diff = SpotDiff()
+    assert not diff.update([spot(1), spot(2)])
+    assert len(diff) == 2
+
+def test_diff_reports_new_and_changed_spots():
+    """Later polls report only new or changed spots"""
+    diff = SpotDiff()
+    diff.update([spot(1), spot(2)])
+    changed = diff.update([spot(1), spot(2, frequency="7030"), spot(3)])
+    assert [s['spotId'] for s in changed] == [2, 3]
+
+    # Spots that expire and come back are new again
+    diff.update([spot(1)])
+    assert [s['spotId'] for s in diff.update([spot(1), spot(2)])] == [2]
+
+def test_diff_ignores_spots_without_id():
+    """Spots without an id are never reported"""
+    diff = SpotDiff()
+    diff.update([])
+    assert not diff.update([{'activator': "N0CALL"}])
+
+def test_subscription_matching():
+    """Spots are matched against the filters of each subscription"""
+    index = SubscriptionIndex()
+    index.add(1)
+    index.add(2, program="us")
+    index.add(3, band="20M", mode="cw")
+    index.add(4, program="VE", band="40m")
+
+    assert index.match(spot(10)) == {1, 2, 3}
+    assert index.match(spot(11, mode="SSB")) == {1, 2}
+    assert index.match(spot(12, reference="VE-0001", frequency="7030")) == {1, 4}
+    assert index.match(spot(13, reference="VE-0001", frequency="14250", mode="SSB")) == {1}
+
+def test_subscription_replace_and_remove():
+    """Subscribing a channel again replaces its filters"""
+    index = SubscriptionIndex()
+    index.add(1, program="US")
+    index.add(1, program="VE")
+    assert len(index) == 1
+    assert index.get(1) == ("VE", None, None)
+    assert not index.match(spot(10))
+
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert index.get(1) is None
+    assert len(index) == 0
+
+def test_feed_groups_changes_by_channel(tmp_path):
+    """The feed groups new spots by subscribed channel"""
+    feed = SpotFeed(str(tmp_path / "pota.db"))
+    feed.load([])
+    feed.subscribe(100, 1, 500)
+    feed.subscribe(100, 2, 500, {'band': "40m"})
+
+    assert not feed.update([spot(1)])
+    changed = feed.update([spot(1), spot(2), spot(3, frequency="7030")])
+    assert {channel: [s['spotId'] for s in spots] for channel, spots in changed.items()} == \
+        {1: [2, 3], 2: [3]}
+    assert feed.spot_count == 3
+
+def test_feed_persists_subscriptions(tmp_path):
+    """Subscriptions are stored and loaded for the bot's guilds"""
+    dbpath = str(tmp_path / "pota.db")
+    feed = SpotFeed(dbpath)
+    record = feed.subscribe(100, 1, 500, {'program': "us", 'mode': "ft8"})
+    assert record['program'] == "US"
+    assert record['mode'] == "FT8"
+    feed.subscribe(100, 2, 500)
+    assert feed.unsubscribe(100, 2)
+    assert not feed.unsubscribe(100, 2)
+
+    reloaded = SpotFeed(dbpath)
+    reloaded.load([100, 200])
+    assert reloaded.subscription_count == 1
+    reloaded.update([])
+    assert list(reloaded.update([spot(1, mode="FT8")])) == [1]
+
+def test_feed_drops_channel_of_any_guild(tmp_path):
+    """A channel is dropped from the guild that subscribed it"""
+    dbpath = str(tmp_path / "pota.db")
+    feed = SpotFeed(dbpath)
+    feed.subscribe(100, 1, 500)
+    assert feed.drop(1)
+    assert not feed.drop(1)
+    assert feed.subscription_count == 0
+
+    reloaded = SpotFeed(dbpath)
+    reloaded.load([100])
+    assert reloaded.subscription_count == 0
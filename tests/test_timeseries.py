@@ -0,0 +1,103 @@
+# Copyright (c) 2025, Blair Kitchen
+# All rights reserved.
+#
+# See the file LICENSE for information on usage and redistribution
+# of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+
+"""Tests for hamclubbot.extensions.util.timeseries"""
+
+import pytest
+
+from hamclubbot.extensions.util.timeseries import RingBuffer, TimeSeriesStore
+
+DAY = 86400
+HOUR = 3600
+START = 100 * DAY
+
+def store(raw_capacity: int = 100) -> TimeSeriesStore:
+    """Returns a store of two fields, rolled up into daily averages"""
+    return TimeSeriesStore(["flux", "kp"], raw_capacity=raw_capacity, rollup_seconds=DAY,
+        rollup_capacity=30)
+
+def test_ring_buffer_overwrites_oldest():
+    """A full ring buffer overwrites its oldest rows"""
+    buffer = RingBuffer(1, 3)
+    assert buffer.oldest() is None
+    for i in range(5):
+        buffer.append(float(i), [i * 10.0])
+    assert len(buffer) == 3
+    assert (buffer.oldest(), buffer.newest()) == (2.0, 4.0)
+    assert buffer.series(0) == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert buffer.series(0, since=3.0) == [(3.0, 30.0), (4.0, 40.0)]
+
+def test_empty_store():
+    """An empty store has no series"""
+    assert not store().series("flux")
+    assert store().newest() is None
+
+def test_series_uses_raw_samples_on_new_store():
+    """A store without rollups returns its raw samples"""
+    ts = store()
+    for i in range(4):
+        ts.add(START + i * HOUR, {'flux': 100.0 + i})
+    assert ts.series("flux", since=START - DAY) == \
+        [(START + i * HOUR, 100.0 + i) for i in range(4)]
+
+    # Three days of samples every three hours, charted over a week
+    ts = store()
+    for i in range(24):
+        ts.add(START + i * 3 * HOUR, {'flux': 100.0, 'kp': 2.0})
+    assert len(ts.series("kp", since=START + 3 * DAY - 7 * DAY)) == 24
+
+def test_series_combines_rollup_and_raw_samples():
+    """Rollups are used only before the oldest raw sample"""
+    ts = store(raw_capacity=8)
+    for i in range(24):
+        ts.add(START + i * 3 * HOUR, {'flux': float(i // 8)})
+
+    # The first two days are only left as daily averages. Raw samples cover the last.
+    assert ts.series("flux", since=0) == [(START, 0.0), (START + DAY, 1.0)] + \
+        [(START + 2 * DAY + i * 3 * HOUR, 2.0) for i in range(8)]
+    assert ts.series("flux", since=START + DAY) == [(START + DAY, 1.0)] + \
+        [(START + 2 * DAY + i * 3 * HOUR, 2.0) for i in range(8)]
+    assert len(ts.series("flux", since=START + 2 * DAY + 12 * HOUR)) == 4
+
+def test_series_skips_missing_values():
+    """Missing values are left out of a series"""
+    ts = store()
+    ts.add(START, {'flux': 100.0})
+    ts.add(START + HOUR, {'kp': 3.0})
+    assert ts.series("flux") == [(START, 100.0)]
+    assert ts.series("kp") == [(START + HOUR, 3.0)]
+
+def test_save_and_load(tmp_path):
+    """A saved store loads with the same series"""
+    path = str(tmp_path / "solar.bin")
+    ts = store(raw_capacity=8)
+    for i in range(24):
+        ts.add(START + i * 3 * HOUR, {'flux': float(i), 'kp': 1.0})
+    ts.save(path)
+
+    loaded = store(raw_capacity=8)
+    assert loaded.load(path)
+    assert loaded.newest() == ts.newest()
+    assert loaded.series("flux") == pytest.approx(ts.series("flux"))
+    assert loaded.series("kp") == ts.series("kp")
+
+    # Samples added after loading continue the same buckets
+    loaded.add(START + 3 * DAY, {'flux': 1.0})
+    ts.add(START + 3 * DAY, {'flux': 1.0})
+    assert loaded.series("flux") == pytest.approx(ts.series("flux"))
+
+def test_load_rejects_missing_or_incompatible_files(tmp_path):
+    """Missing, incompatible or corrupt files are not loaded"""
+    path = str(tmp_path / "solar.bin")
+    assert not store().load(path)
+
+    store().save(path)
+    assert not store(raw_capacity=10).load(path)
+    assert not TimeSeriesStore(["flux"], 100, DAY, 30).load(path)
+
+    with open(path, "wb") as stream:
+        stream.write(b"garbage")
+    assert not store().load(path)